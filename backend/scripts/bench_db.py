@@ -0,0 +1,66 @@
+"""Load benchmark: blocking mongoengine reads vs the async data-access layer.
+
+Fires `--requests` concurrent "get post by id" operations (at most
+`--concurrency` in flight) through both paths and prints throughput. The
+blocking path serializes every round trip on the event loop; the async path
+overlaps them.
+
+Usage (from backend/, with MongoDB reachable at MONGODB_URI and at least one
+post in the database):
+
+    python -m scripts.bench_db --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.database import connect_db, disconnect_db
+from src.models.post import Post
+from src.repositories import posts as posts_repo
+
+
+async def _run(label: str, fetch, post_ids, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await fetch(post_ids[i % len(post_ids)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {requests / elapsed:>10.0f} req/s  ({elapsed:.2f}s total)")
+
+
+async def _blocking_fetch(post_id: str):
+    # What the route handlers did before: sync driver inside a coroutine.
+    Post.objects(id=post_id).first()
+
+
+async def _async_fetch(post_id: str):
+    await posts_repo.get_post(post_id)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    connect_db()
+    try:
+        post_ids = [str(p.id) for p in Post.objects.only("id").limit(100)]
+        if not post_ids:
+            raise SystemExit("No posts found; plan a theme first.")
+
+        await _run(
+            "mongoengine", _blocking_fetch, post_ids, args.requests, args.concurrency
+        )
+        await _run("async", _async_fetch, post_ids, args.requests, args.concurrency)
+    finally:
+        await disconnect_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,37 +1,238 @@
+import asyncio
 import calendar
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple, Type, TypeVar
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel
 
-from ...config import settings, get_llm
-from .models import CurriculumPlan
-from .prompts import CURRICULUM_PLANNING_PROMPT
+from ...config import settings
+from ..llm_cache import cached_structured_invoke
+from ..progress import ProgressCallback, emit
+from .models import CurriculumOutline, CurriculumPlan, WeekOutline
+from .prompts import (
+    CURRICULUM_OUTLINE_PROMPT,
+    CURRICULUM_REPLANNING_PROMPT,
+    WEEK_EXPANSION_PROMPT,
+)
+
+PLANNING_TEMPERATURE = 0.7
+
+
+DAYS_PER_WEEK = 7
+
+T = TypeVar("T")
+
+
+def _week_ranges(num_days: int) -> List[Tuple[int, int]]:
+    """Splits the month into inclusive (start_day, end_day) weeks."""
+    return [
+        (start, min(start + DAYS_PER_WEEK - 1, num_days))
+        for start in range(1, num_days + 1, DAYS_PER_WEEK)
+    ]
+
+
+async def _invoke_validated(
+    label: str,
+    schema: Type[BaseModel],
+    prompt: str,
+    check: Callable[[Any], T],
+    force_refresh: bool,
+    on_token: Optional[Callable[[str], None]],
+) -> T:
+    """Runs one planning call and retries it on its own until `check` accepts it.
+
+    Retries bypass the LLM cache so a well-formed but incomplete answer is
+    not served again.
+    """
+    attempts = settings.planning_chunk_attempts
+    for attempt in range(1, attempts + 1):
+        try:
+            result = await cached_structured_invoke(
+                schema,
+                PLANNING_TEMPERATURE,
+                [
+                    SystemMessage(content="You are an expert curriculum planner."),
+                    HumanMessage(content=prompt),
+                ],
+                bypass_cache=force_refresh or attempt > 1,
+                on_token=on_token,
+            )
+            return check(result)
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            print(f"   ! {label} attempt {attempt}/{attempts} failed: {e}")
 
 
 async def plan_curriculum(
-    theme_title: str, month: int, year: int
+    theme_title: str,
+    month: int,
+    year: int,
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
 ) -> List[Dict[str, Any]]:
-    """Generates a monthly curriculum plan for a given theme."""
+    """Generates a monthly curriculum plan for a given theme.
+
+    A short week-level outline is generated first, then every week is
+    expanded into daily topics concurrently, each validated and retried on
+    its own. Identical requests are answered from the LLM cache unless
+    `force_refresh`. `progress` receives stage changes and tokens as they
+    stream.
+    """
     print(
         f"--- Planning Curriculum: {theme_title} for {month}/{year} ({settings.llm_provider}) ---"
     )
 
     num_days = calendar.monthrange(year, month)[1]
-    llm = get_llm(temperature=0.7)
-    structured_llm = llm.with_structured_output(CurriculumPlan)
+    weeks = _week_ranges(num_days)
+
+    def stream(**labels):
+        if progress is None:
+            return None
+        return lambda text: emit(progress, "token", text=text, **labels)
+
+    def check_outline(outline: CurriculumOutline) -> List[WeekOutline]:
+        if len(outline.weeks) != len(weeks):
+            raise ValueError(f"expected {len(weeks)} weeks, got {len(outline.weeks)}")
+        return sorted(outline.weeks, key=lambda w: w.week)
+
+    async def expand_week(week: int, outline: str) -> List[Dict[str, Any]]:
+        start_day, end_day = weeks[week - 1]
+
+        def check_week(plan: CurriculumPlan) -> List[Dict[str, Any]]:
+            topics = {}
+            for topic in plan.topics:
+                if start_day <= topic.day <= end_day:
+                    topics.setdefault(topic.day, topic.model_dump())
+            missing = set(range(start_day, end_day + 1)) - set(topics)
+            if missing:
+                raise ValueError(f"missing days {sorted(missing)}")
+            return [topics[day] for day in sorted(topics)]
+
+        prompt = WEEK_EXPANSION_PROMPT.format(
+            theme_title=theme_title,
+            month=month,
+            year=year,
+            num_days=num_days,
+            outline=outline,
+            week=week,
+            start_day=start_day,
+            end_day=end_day,
+        )
+        topics = await _invoke_validated(
+            f"Week {week}",
+            CurriculumPlan,
+            prompt,
+            check_week,
+            force_refresh,
+            stream(week=week),
+        )
+        print(f"   > Week {week} planned (days {start_day}-{end_day}).")
+        emit(progress, "week", week=week, topics=len(topics))
+        return topics
+
+    try:
+        # 1. Outline the month week by week
+        print(f"   > Step 1: Outlining {len(weeks)} weeks...")
+        emit(progress, "stage", stage="outline", weeks=len(weeks))
+        prompt = CURRICULUM_OUTLINE_PROMPT.format(
+            theme_title=theme_title,
+            month=month,
+            year=year,
+            num_days=num_days,
+            weeks="\n".join(
+                f"Week {i}: days {start}-{end}"
+                for i, (start, end) in enumerate(weeks, start=1)
+            ),
+        )
+        week_outlines = await _invoke_validated(
+            "Outline",
+            CurriculumOutline,
+            prompt,
+            check_outline,
+            force_refresh,
+            stream(),
+        )
+        outline_text = "\n".join(
+            f"Week {i} (days {start}-{end}): {w.focus} - {w.summary}"
+            for i, ((start, end), w) in enumerate(zip(weeks, week_outlines), start=1)
+        )
+
+        # 2. Expand every week concurrently
+        print("   > Step 2: Expanding weeks into daily topics...")
+        emit(progress, "stage", stage="expand", weeks=len(weeks))
+        results = await asyncio.gather(
+            *[expand_week(i, outline_text) for i in range(1, len(weeks) + 1)],
+            return_exceptions=True,
+        )
+        for week, result in enumerate(results, start=1):
+            if isinstance(result, BaseException):
+                raise RuntimeError(f"Week {week} failed: {result}")
+    except Exception as e:
+        print(f"   x Curriculum Planning Error: {e}")
+        emit(progress, "warning", message=f"Curriculum planning error: {e}")
+        return []
+
+    topics = [topic for chunk in results for topic in chunk]
+    print(f"   + Successfully planned {len(topics)} topics.")
+    emit(progress, "planned", topics=len(topics))
+    return topics
+
 
-    prompt = CURRICULUM_PLANNING_PROMPT.format(
-        theme_title=theme_title, month=month, year=year, num_days=num_days
+async def replan_days(
+    theme_title: str,
+    month: int,
+    year: int,
+    days: List[int],
+    current_plan: Dict[int, str],
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """Regenerates the topics for `days` only, using the rest of the plan as context.
+
+    `current_plan` maps each planned day to its title. Only topics for the
+    requested days are returned; anything else the LLM produces is dropped.
+    """
+    print(
+        f"--- Replanning days {days}: {theme_title} for {month}/{year} ({settings.llm_provider}) ---"
+    )
+
+    num_days = calendar.monthrange(year, month)[1]
+    emit(progress, "stage", stage="replan", days=days)
+    outline = "\n".join(
+        f"Day {day}: "
+        + ("<to be replaced>" if day in days else current_plan.get(day, "<empty>"))
+        for day in range(1, num_days + 1)
+    )
+    prompt = CURRICULUM_REPLANNING_PROMPT.format(
+        theme_title=theme_title,
+        month=month,
+        year=year,
+        num_days=num_days,
+        current_plan=outline,
+        days=", ".join(str(day) for day in days),
     )
 
     try:
-        plan = await structured_llm.ainvoke(
+        plan = await cached_structured_invoke(
+            CurriculumPlan,
+            PLANNING_TEMPERATURE,
             [
                 SystemMessage(content="You are an expert curriculum planner."),
                 HumanMessage(content=prompt),
-            ]
+            ],
+            bypass_cache=force_refresh,
+            on_token=progress and (lambda text: emit(progress, "token", text=text)),
         )
-        print(f"   + Successfully planned {len(plan.topics)} topics.")
-        return [topic.model_dump() for topic in plan.topics]
     except Exception as e:
-        print(f"   x Curriculum Planning Error: {e}")
+        print(f"   x Curriculum Replanning Error: {e}")
+        emit(progress, "warning", message=f"Curriculum replanning error: {e}")
         return []
+
+    wanted = set(days)
+    topics = {t.day: t.model_dump() for t in plan.topics if t.day in wanted}
+    missing = wanted - set(topics)
+    if missing:
+        print(f"   ! LLM skipped days {sorted(missing)}.")
+    print(f"   + Successfully replanned {len(topics)} topics.")
+    emit(progress, "planned", topics=len(topics))
+    return [topics[day] for day in sorted(topics)]
@@ -19,3 +19,17 @@ class CurriculumPlan(BaseModel):
     topics: List[DailyTopic] = Field(
         description="List of daily topics for the entire month"
     )
+
+
+class WeekOutline(BaseModel):
+    week: int = Field(description="The week number, starting at 1")
+    focus: str = Field(description="The sub-theme this week builds towards")
+    summary: str = Field(
+        description="1-2 sentences on the concepts the week covers, in order"
+    )
+
+
+class CurriculumOutline(BaseModel):
+    weeks: List[WeekOutline] = Field(
+        description="One entry per week of the month, in order"
+    )
@@ -1,15 +1,46 @@
-CURRICULUM_PLANNING_PROMPT = """You are an expert content strategist and educator.
+CURRICULUM_OUTLINE_PROMPT = """You are an expert content strategist and educator.
 Theme: {theme_title}
 Target Month: {month}/{year} ({num_days} days)
 
-Create a progressive 30-day (or {num_days}-day) curriculum. 
+Outline a progressive {num_days}-day curriculum, split into these weeks:
+{weeks}
+
 The curriculum should start with foundational concepts and gradually move to advanced topics.
+For EACH week, give the sub-theme it focuses on and a short summary of the concepts it covers, in order.
+Weeks must not overlap and together must form a logical learning path."""
+
+WEEK_EXPANSION_PROMPT = """You are an expert content strategist and educator.
+Theme: {theme_title}
+Target Month: {month}/{year} ({num_days} days)
+
+The month follows this outline:
+{outline}
+
+Expand week {week} (days {start_day}-{end_day}) into one topic per day.
+
+For EACH day from {start_day} to {end_day}, provide:
+1. A compelling title.
+2. A clear learning objective.
+3. Difficulty level (Beginner for days 1-10, Intermediate for days 11-20, Advanced for the rest).
+4. Content type (link, article, or forum).
+5. 3-5 specific, high-intent search queries that will be used to scrape deep information for that day's post.
+
+Ensure the topics are distinct, follow the week's focus and build on the weeks before it."""
+
+CURRICULUM_REPLANNING_PROMPT = """You are an expert content strategist and educator.
+Theme: {theme_title}
+Target Month: {month}/{year} ({num_days} days)
+
+The month already has a progressive curriculum. Here is the current plan, one line per day:
+{current_plan}
+
+Replace the topics for these days only: {days}.
 
-For EACH day, provide:
+For EACH of those days, provide:
 1. A compelling title.
 2. A clear learning objective.
-3. Difficulty level (Beginner for first 10 days, Intermediate for next 10, Advanced for last 10).
+3. Difficulty level matching the day's place in the progression (Beginner for the first 10 days, Intermediate for the next 10, Advanced for the rest).
 4. Content type (link, article, or forum).
 5. 3-5 specific, high-intent search queries that will be used to scrape deep information for that day's post.
 
-Ensure the topics are distinct and follow a logical learning path."""
+The new topics must fit between their neighbouring days, build on what came before and must not repeat any topic that stays in the plan."""
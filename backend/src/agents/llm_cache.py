@@ -0,0 +1,113 @@
+import hashlib
+import json
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Type, TypeVar
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel, ValidationError
+
+from ..config import settings, get_llm_model, get_streaming_llm, get_structured_llm
+from ..database import get_async_db
+from ..models.llm_cache import LLMCacheEntry
+
+cache_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def _cache_key(
+    model: str,
+    temperature: float,
+    messages: List[BaseMessage],
+    schema: Type[BaseModel],
+) -> str:
+    raw = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            # The full JSON schema, so editing a field description invalidates
+            "schema": schema.model_json_schema(),
+            "messages": [[m.type, m.content] for m in messages],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _stream_structured(
+    schema: Type[SchemaT],
+    temperature: float,
+    messages: List[BaseMessage],
+    on_token: Callable[[str], None],
+) -> SchemaT:
+    """Streams the tool-call arguments to `on_token` and parses the final call."""
+    message = None
+    async for chunk in get_streaming_llm(schema, temperature).astream(messages):
+        for tool_chunk in chunk.tool_call_chunks:
+            if tool_chunk.get("args"):
+                on_token(tool_chunk["args"])
+        message = chunk if message is None else message + chunk
+
+    if message is None or not message.tool_calls:
+        raise ValueError(f"LLM returned no {schema.__name__}")
+    return schema.model_validate(message.tool_calls[0]["args"])
+
+
+async def cached_structured_invoke(
+    schema: Type[SchemaT],
+    temperature: float,
+    messages: List[BaseMessage],
+    bypass_cache: bool = False,
+    limit: Optional[object] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> SchemaT:
+    """Invokes the structured LLM, served from the LLM cache when possible.
+
+    `bypass_cache` forces a fresh call (the result still replaces the cached
+    one). `limit` is an optional async context manager, such as a semaphore,
+    held only around the live call so cache hits never queue behind it.
+    With `on_token`, a live call streams the raw JSON output as it arrives.
+    """
+    model = get_llm_model()
+    key = _cache_key(model, temperature, messages, schema)
+    now = datetime.now(timezone.utc)
+    collection = get_async_db()[LLMCacheEntry._get_collection_name()]
+
+    if bypass_cache:
+        cache_stats["bypassed"] += 1
+    else:
+        cached = await collection.find_one(
+            {"key": key, "expires_at": {"$gt": now}}, {"result": 1}
+        )
+        if cached:
+            try:
+                result = schema.model_validate(cached["result"])
+                cache_stats["hits"] += 1
+                return result
+            except ValidationError:
+                # Written by an incompatible version of the schema; refetch.
+                pass
+        cache_stats["misses"] += 1
+
+    async with limit or nullcontext():
+        if on_token is not None:
+            result = await _stream_structured(schema, temperature, messages, on_token)
+        else:
+            structured_llm = get_structured_llm(schema, temperature)
+            result = await structured_llm.ainvoke(messages)
+
+    await collection.update_one(
+        {"key": key},
+        {
+            "$set": {
+                "model": model,
+                "temperature": temperature,
+                "schema": schema.__name__,
+                "result": result.model_dump(),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=settings.llm_cache_ttl),
+            }
+        },
+        upsert=True,
+    )
+    return result
@@ -0,0 +1,11 @@
+from typing import Any, Callable, Optional
+
+# Receives (event, data) pairs as an agent run advances, e.g.
+# ("stage", {"stage": "scrape"}) or ("token", {"text": "..."}).
+ProgressCallback = Callable[[str, dict], None]
+
+
+def emit(progress: Optional[ProgressCallback], event: str, **data: Any):
+    """Reports a progress event if anyone is listening."""
+    if progress is not None:
+        progress(event, data)
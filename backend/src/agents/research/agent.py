@@ -1,14 +1,20 @@
 import asyncio
-import aiohttp
-from typing import List, Dict, Any
-from ddgs import DDGS
+from typing import List, Dict, Any, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 
-from ...config import settings, get_llm
+from ...config import settings
+from ..llm_cache import cached_structured_invoke
+from ..progress import ProgressCallback, emit
+from ..tools.dedup import NearDuplicateFilter, canonicalize_url
+from ..tools.search import search_text
 from ..tools.web import fetch_url
+from .context import build_context, estimate_tokens
+from .limits import search_limit, scrape_limit, llm_limit
 from .models import ResearchSynthesis
 from .prompts import RESEARCH_SYNTHESIS_PROMPT
 
+SYNTHESIS_TEMPERATURE = 0.5
+
 
 async def research_single_topic(
     title: str,
@@ -16,68 +22,145 @@ async def research_single_topic(
     search_queries: List[str],
     difficulty: str,
     day: int,
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
 ) -> Dict[str, Any]:
-    """Executes deep research by searching, scraping, and synthesizing multiple sources."""
-    print(f"--- Deep Researching: {title} ({settings.llm_provider}) ---")
+    """Executes deep research by searching, scraping, and synthesizing multiple sources.
 
-    ddgs = DDGS()
-    urls = []
+    `force_refresh` bypasses the page and LLM caches, re-downloading every
+    source and re-running the synthesis. `progress` receives stage changes,
+    per-query and per-URL results and the synthesis tokens as they stream.
+    """
+    print(f"--- Deep Researching: {title} ({settings.llm_provider}) ---")
 
     # 1. Search
     max_search_results = (
         20 if difficulty == "Beginner" else 35 if difficulty == "Intermediate" else 45
     )
+    per_query = max_search_results // len(search_queries)
     print(f"   > Step 1: Searching (Max results: {max_search_results})...")
+    emit(progress, "stage", stage="search", queries=len(search_queries))
+
+    loop = asyncio.get_running_loop()
+    deadline = None
+    timed_out = 0
+
+    def time_left() -> float:
+        # The overall deadline starts when this run's first live search gets
+        # a slot, so time spent queued behind other runs doesn't count.
+        nonlocal deadline
+        if deadline is None:
+            deadline = loop.time() + settings.search_deadline
+        return deadline - loop.time()
 
-    for query in search_queries:
+    async def search_one(query: str) -> List[str]:
+        nonlocal timed_out
+        print(f"     - Query: {query}")
         try:
-            print(f"     - Query: {query}")
-            results = list(
-                ddgs.text(
-                    query,
-                    max_results=max_search_results // len(search_queries),
-                    timelimit="y",
-                )
+            results = await search_text(
+                query,
+                max_results=per_query,
+                timelimit="y",
+                limit=search_limit,
+                time_left=time_left,
             )
-            urls.extend([r["href"] for r in results if "href" in r])
+            hrefs = [r["href"] for r in results if "href" in r]
+            emit(progress, "search", query=query, results=len(hrefs))
+            return hrefs
+        except asyncio.TimeoutError:
+            timed_out += 1
+            print(f"     ! Search timed out for query '{query}'")
+            emit(progress, "search", query=query, error="timeout")
         except Exception as e:
             print(f"     ! Search error for query '{query}': {e}")
+            emit(progress, "search", query=query, error=str(e))
+        return []
 
-    # Deduplicate and limit to top 10 unique URLs
-    unique_urls = list(dict.fromkeys(urls))[:10]
-    print(f"   > Found {len(unique_urls)} unique URLs to scrape.")
+    # All queries run concurrently; whatever hasn't answered by the overall
+    # deadline is dropped so one slow query can't stall the whole run.
+    results = await asyncio.gather(*[search_one(q) for q in search_queries])
+    if timed_out:
+        print(f"     ! Search deadline hit; dropped {timed_out} queries.")
+
+    urls = [url for hrefs in results for url in hrefs]
+
+    # Deduplicate on canonical URLs, keeping the first link seen for each page
+    seen_urls = set()
+    candidates = []
+    for url in urls:
+        canonical = canonicalize_url(url)
+        if canonical not in seen_urls:
+            seen_urls.add(canonical)
+            candidates.append(url)
+    print(f"   > Found {len(candidates)} unique URLs to scrape.")
 
     # 2. Scrape
     print(f"   > Step 2: Scraping content...")
-    scraped_content = []
-    async with aiohttp.ClientSession(
-        headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-    ) as session:
-        tasks = [fetch_url(session, url) for url in unique_urls]
-        pages = await asyncio.gather(*tasks)
+    emit(progress, "stage", stage="scrape", candidates=len(candidates))
+    max_sources = settings.research_max_sources
+    duplicates = NearDuplicateFilter(settings.research_duplicate_threshold)
+    scraped_pages = []
+    unique_urls = []
+    skipped = 0
 
-        for url, content in zip(unique_urls, pages):
-            if content:
-                scraped_content.append(f"Source: {url}\nContent: {content}")
+    async def limited_fetch(url: str):
+        async with scrape_limit:
+            content = await fetch_url(url, force_refresh=force_refresh)
+        if not content:
+            emit(progress, "fetch", url=url, status="failed")
+        return content
 
-    print(f"   > Successfully scraped {len(scraped_content)} pages.")
+    # Scrape in waves: pages that fail or repeat an earlier source free their
+    # slot for the next search result until enough distinct sources are found.
+    while candidates and len(scraped_pages) < max_sources:
+        batch = candidates[: max_sources - len(scraped_pages)]
+        candidates = candidates[len(batch) :]
+        unique_urls.extend(batch)
+        pages = await asyncio.gather(*[limited_fetch(url) for url in batch])
 
-    if not scraped_content:
-        print("   ! No content scraped. Ending research.")
-        return {
-            "summary": "Deep research failed to find or scrape relevant sources.",
-            "sources": unique_urls,
-            "status": "researched",
-        }
+        for url, content in zip(batch, pages):
+            if not content:
+                continue
+            if not duplicates.add(content):
+                skipped += 1
+                emit(progress, "fetch", url=url, status="duplicate")
+                continue
+            scraped_pages.append((url, content))
+            emit(progress, "fetch", url=url, status="ok", chars=len(content))
+
+    print(
+        f"   > Successfully scraped {len(scraped_pages)} pages "
+        f"({skipped} near-duplicates dropped)."
+    )
+
+    if not scraped_pages:
+        # Fail rather than return an empty result, which would be saved as
+        # "researched" and never picked up by a later theme run.
+        print("   x No content scraped. Ending research.")
+        raise RuntimeError(
+            f"No sources could be scraped ({len(unique_urls)} URLs tried)"
+        )
 
     # 3. Synthesize
     print(f"   > Step 3: Synthesizing with {settings.llm_provider}...")
-    llm = get_llm(temperature=0.5)
-    structured_llm = llm.with_structured_output(ResearchSynthesis)
-
-    context = "\n\n---\n\n".join(scraped_content)
+    # Keep only the passages most relevant to the topic within the token budget
+    context = build_context(
+        scraped_pages,
+        query=" ".join([title, learning_objective, *search_queries]),
+        max_tokens=settings.research_context_tokens,
+        chunk_tokens=settings.research_chunk_tokens,
+    )
+    scraped_tokens = sum(estimate_tokens(text) for _, text in scraped_pages)
+    print(
+        f"   > Context: ~{estimate_tokens(context)} of ~{scraped_tokens} scraped tokens."
+    )
+    emit(
+        progress,
+        "stage",
+        stage="synthesize",
+        sources=len(scraped_pages),
+        context_tokens=estimate_tokens(context),
+    )
     prompt = RESEARCH_SYNTHESIS_PROMPT.format(
         title=title,
         day=day,
@@ -87,13 +170,18 @@ async def research_single_topic(
     )
 
     try:
-        synthesis = await structured_llm.ainvoke(
+        synthesis = await cached_structured_invoke(
+            ResearchSynthesis,
+            SYNTHESIS_TEMPERATURE,
             [
                 SystemMessage(
                     content="You are an expert researcher and LinkedIn content strategist."
                 ),
                 HumanMessage(content=prompt),
-            ]
+            ],
+            bypass_cache=force_refresh,
+            limit=llm_limit,
+            on_token=progress and (lambda text: emit(progress, "token", text=text)),
         )
         print("   + Synthesis complete.")
         return {
@@ -109,6 +197,7 @@ async def research_single_topic(
         }
     except Exception as e:
         print(f"   x Synthesis Error: {e}")
+        emit(progress, "warning", message=f"Synthesis error: {e}")
         return {
             "day": day,
             "title": title,
@@ -0,0 +1,106 @@
+import re
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+# Rough English average; good enough for budgeting without a tokenizer.
+CHARS_PER_TOKEN = 4
+
+# BM25 parameters (standard Okapi defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to "
+    "what when where which who why with".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, chunk_tokens: int) -> List[str]:
+    """Splits text into roughly `chunk_tokens`-sized chunks on sentence breaks."""
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    chunks, current = [], ""
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+        # A single run-on "sentence" (tables, lists) is hard-split.
+        while len(current) > max_chars:
+            chunks.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bm25_scores(chunks: Sequence[str], query: str) -> np.ndarray:
+    """Scores each chunk against `query` with Okapi BM25."""
+    vocab = {term: i for i, term in enumerate(dict.fromkeys(_terms(query)))}
+    scores = np.zeros(len(chunks))
+    if not vocab or not chunks:
+        return scores
+
+    tf = np.zeros((len(chunks), len(vocab)))
+    lengths = np.zeros(len(chunks))
+    for row, chunk in enumerate(chunks):
+        terms = _terms(chunk)
+        lengths[row] = len(terms)
+        for term in terms:
+            col = vocab.get(term)
+            if col is not None:
+                tf[row, col] += 1
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(chunks) - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    scores = (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+    return scores
+
+
+def build_context(
+    pages: Sequence[Tuple[str, str]],
+    query: str,
+    max_tokens: int,
+    chunk_tokens: int,
+) -> str:
+    """Packs the chunks most relevant to `query` into a `max_tokens` budget.
+
+    `pages` are (url, text) pairs. Selected chunks are emitted grouped by
+    source and in their original reading order, so the prompt still reads
+    as excerpts from each page.
+    """
+    chunks: List[Tuple[int, int, str]] = []  # (page, position, text)
+    for page_idx, (_, text) in enumerate(pages):
+        for pos, chunk in enumerate(chunk_text(text, chunk_tokens)):
+            chunks.append((page_idx, pos, chunk))
+
+    scores = bm25_scores([c[2] for c in chunks], query)
+    selected: Dict[int, List[Tuple[int, str]]] = {}
+    used = 0
+    # Stable sort keeps earlier (usually higher-ranked) sources first on ties.
+    for idx in np.argsort(-scores, kind="stable"):
+        page_idx, pos, chunk = chunks[idx]
+        cost = estimate_tokens(chunk)
+        if used + cost > max_tokens:
+            continue
+        selected.setdefault(page_idx, []).append((pos, chunk))
+        used += cost
+
+    blocks = []
+    for page_idx in sorted(selected):
+        excerpts = " [...] ".join(text for _, text in sorted(selected[page_idx]))
+        blocks.append(f"Source: {pages[page_idx][0]}\nContent: {excerpts}")
+    return "\n\n---\n\n".join(blocks)
@@ -0,0 +1,9 @@
+import asyncio
+
+from ...config import settings
+
+# Process-wide budgets shared by every research run, so fanning out over a
+# whole theme saturates each stage without tripping provider rate limits.
+search_limit = asyncio.Semaphore(settings.research_search_concurrency)
+scrape_limit = asyncio.Semaphore(settings.research_scrape_concurrency)
+llm_limit = asyncio.Semaphore(settings.research_llm_concurrency)
@@ -0,0 +1,116 @@
+import hashlib
+import re
+from typing import List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import numpy as np
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = frozenset(
+    [
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "ref",
+        "ref_src",
+        "source",
+        "_hsenc",
+        "_hsmi",
+        "spm",
+    ]
+)
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+
+# Fixed seed so signatures are comparable across processes and restarts
+_PERMUTATIONS = np.random.default_rng(0x5EED).integers(
+    1, 2**63, size=(MINHASH_PERMUTATIONS, 2), dtype=np.uint64
+) | np.uint64(1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalizes a URL so trivially different links to one page compare equal.
+
+    Lowercases the scheme and host, drops `www.`/`m.` prefixes, default
+    ports, fragments, trailing slashes and tracking parameters, and sorts
+    the remaining query string. Only used as a dedup key; the original URL
+    is still what gets fetched.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+            break
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path)
+    if path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    path = path.rstrip("/") or "/"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    # http/https variants of one page are the same source
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = _WORD_RE.findall(text.lower())
+    shingles = {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    return np.array(
+        [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+            for s in shingles
+        ],
+        dtype=np.uint64,
+    )
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of the text's word shingles.
+
+    Each row of `_PERMUTATIONS` is a multiply-shift hash; uint64 arithmetic
+    wraps, which is exactly the modulus we want.
+    """
+    hashes = _shingle_hashes(text)
+    a, b = _PERMUTATIONS[:, :1], _PERMUTATIONS[:, 1:]
+    return ((a * hashes[None, :] + b) >> np.uint64(32)).min(axis=1)
+
+
+class NearDuplicateFilter:
+    """Remembers accepted texts' MinHash signatures and flags near-copies.
+
+    Two texts are near-duplicates when their estimated shingle Jaccard
+    similarity is at least `threshold`.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._signatures: List[np.ndarray] = []
+
+    def add(self, text: str) -> bool:
+        """Records `text` and returns True, or False if it is a near-duplicate."""
+        signature = minhash(text)
+        for seen in self._signatures:
+            if np.mean(signature == seen) >= self.threshold:
+                return False
+        self._signatures.append(signature)
+        return True
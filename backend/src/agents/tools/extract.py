@@ -0,0 +1,103 @@
+from typing import Optional
+from lxml import etree
+
+# Subtrees whose text never belongs in the research context
+SKIPPED_TAGS = {"script", "style", "nav", "footer", "header", "noscript", "template"}
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    """True for HTML responses, or when the server didn't say what it sent."""
+    if not content_type:
+        return True
+    return content_type.split(";")[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+class _TextCollector:
+    """lxml parser target that keeps visible text and drops skipped subtrees.
+
+    No tree is built, so memory stays proportional to the text kept.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._parts = []
+        self._length = 0
+        self._skip_depth = 0
+        # Raw text of the current run; a text node may arrive in several pieces
+        self._pending = []
+        self._pending_length = 0
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+
+    def _flush(self):
+        if not self._pending:
+            return
+        text = " ".join("".join(self._pending).split())
+        self._pending.clear()
+        self._pending_length = 0
+        if text:
+            self._parts.append(text)
+            self._length += len(text) + 1
+
+    def start(self, tag, attrib):
+        self._flush()
+        if self._skip_depth or tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        if self._skip_depth or self.full:
+            return
+        self._pending.append(data)
+        self._pending_length += len(data)
+        if self._pending_length > self.max_chars:
+            # Pathological single text node; cap the buffer regardless.
+            self._flush()
+
+    def close(self) -> str:
+        self._flush()
+        return " ".join(self._parts)[: self.max_chars]
+
+
+class StreamingTextExtractor:
+    """Incrementally turns HTML bytes into text, stopping at `max_chars`."""
+
+    def __init__(self, max_chars: int, encoding: Optional[str] = None):
+        self._target = _TextCollector(max_chars)
+        self._parser = etree.HTMLParser(
+            target=self._target, encoding=encoding, recover=True, no_network=True
+        )
+
+    def feed(self, chunk: bytes) -> bool:
+        """Feeds a chunk; returns True once the text budget is reached."""
+        self._parser.feed(chunk)
+        return self._target.full
+
+    def close(self) -> str:
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            # Raised for empty or hopelessly broken documents.
+            return self._target.close()
+
+
+def extract_text(html: bytes, max_chars: int, encoding: Optional[str] = None) -> str:
+    """Converts an HTML document to visible text, stopping at `max_chars`.
+
+    Kept free of app imports so it is cheap to run in a worker process.
+    """
+    extractor = StreamingTextExtractor(max_chars, encoding)
+    for start in range(0, len(html), FEED_CHUNK_SIZE):
+        if extractor.feed(html[start : start + FEED_CHUNK_SIZE]):
+            break
+    return extractor.close()
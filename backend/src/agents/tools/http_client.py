@@ -0,0 +1,140 @@
+import asyncio
+import time
+import aiohttp
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from ...config import settings
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class _TokenBucket:
+    """Allows `rate` requests per second on average with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HttpClient:
+    """Application-wide HTTP client used for scraping.
+
+    Owns one pooled `aiohttp.ClientSession` (keep-alive, DNS cache, per-host
+    connection caps), throttles each host with a token bucket and honours a
+    cached copy of each origin's robots.txt.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._robots: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self._robots_pending: Dict[str, asyncio.Task] = {}
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=settings.http_pool_limit,
+            limit_per_host=settings.http_pool_limit_per_host,
+            ttl_dns_cache=settings.http_dns_cache_ttl,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=settings.http_request_timeout),
+        )
+        print("HTTP client started")
+
+    async def stop(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        for task in self._robots_pending.values():
+            task.cancel()
+        self._robots_pending.clear()
+        print("HTTP client stopped")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Lazily start when used outside the app lifespan (e.g. scripts).
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def _bucket(self, host: str) -> _TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = _TokenBucket(settings.http_host_rate, settings.http_host_burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def _fetch_robots(self, origin: str) -> Optional[RobotFileParser]:
+        session = await self._get_session()
+        try:
+            async with session.get(
+                f"{origin}/robots.txt", timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status != 200:
+                    # No robots.txt (or an error page) means no restrictions.
+                    return None
+                body = await response.text(errors="replace")
+        except Exception:
+            return None
+
+        parser = RobotFileParser()
+        parser.parse(body.splitlines())
+        return parser
+
+    async def _robots_for(self, origin: str) -> Optional[RobotFileParser]:
+        cached = self._robots.get(origin)
+        if cached and time.monotonic() - cached[1] < settings.robots_cache_ttl:
+            return cached[0]
+
+        # Coalesce concurrent lookups for the same origin into one request.
+        task = self._robots_pending.get(origin)
+        if task is None:
+            task = asyncio.create_task(self._fetch_robots(origin))
+            self._robots_pending[origin] = task
+        try:
+            parser = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._robots_pending.pop(origin, None)
+
+        self._robots[origin] = (parser, time.monotonic())
+        return parser
+
+    async def is_allowed(self, url: str) -> bool:
+        """Checks the origin's robots.txt (cached for robots_cache_ttl)."""
+        parts = urlsplit(url)
+        parser = await self._robots_for(f"{parts.scheme}://{parts.netloc}")
+        return parser is None or parser.can_fetch(USER_AGENT, url)
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Rate-limited GET on the shared session; use as an async context manager."""
+        await self._bucket(urlsplit(url).netloc).acquire()
+        session = await self._get_session()
+        async with session.get(url, **kwargs) as response:
+            yield response
+
+
+http_client = HttpClient()
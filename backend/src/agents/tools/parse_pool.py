@@ -0,0 +1,55 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from ...config import settings
+from .extract import extract_text
+
+_executor: Optional[Executor] = None
+
+
+def _create_executor() -> Executor:
+    if settings.html_parse_executor == "thread":
+        return ThreadPoolExecutor(
+            max_workers=settings.html_parse_workers, thread_name_prefix="html-parse"
+        )
+    # "spawn" rather than fork: the API process has live driver and DB threads.
+    return ProcessPoolExecutor(
+        max_workers=settings.html_parse_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def get_parse_executor() -> Executor:
+    """Returns the process-wide HTML parsing pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = _create_executor()
+    return _executor
+
+
+def shutdown_parse_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def extract_text_async(
+    html: bytes, max_chars: int, encoding: Optional[str] = None
+) -> str:
+    """Runs `extract_text` on the shared pool so parsing never blocks the loop."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            get_parse_executor(), extract_text, html, max_chars, encoding
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a hostile page); rebuild the pool once.
+        print("      ! HTML parse pool broke; restarting it.")
+        shutdown_parse_executor()
+        return await loop.run_in_executor(
+            get_parse_executor(), extract_text, html, max_chars, encoding
+        )
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from ddgs import DDGS
+
+from ...config import settings
+from ...database import get_async_db
+from ...models.search_cache import SearchCacheEntry
+
+cache_stats = {"hits": 0, "misses": 0}
+
+# DDGS is synchronous; run it on a dedicated pool so searches never block the
+# event loop or starve other users of the default executor.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.research_search_concurrency, thread_name_prefix="ddgs"
+)
+
+
+def _search_sync(query: str, max_results: int, timelimit: str) -> List[Dict[str, Any]]:
+    # DDGS instances hold per-session state, so each call gets its own.
+    ddgs = DDGS(timeout=int(settings.search_query_timeout))
+    return list(ddgs.text(query, max_results=max_results, timelimit=timelimit))
+
+
+def _cache_key(query: str, max_results: int, timelimit: str) -> str:
+    normalized = " ".join(query.lower().split())
+    raw = f"{normalized}|{timelimit}|{max_results}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def search_text(
+    query: str,
+    max_results: int,
+    timelimit: str = "y",
+    limit: Optional[Any] = None,
+    time_left: Optional[Callable[[], float]] = None,
+) -> List[Dict[str, Any]]:
+    """Runs a DuckDuckGo text search, served from the search cache when fresh.
+
+    Live searches run in a worker thread with a per-query timeout. `limit`
+    is an optional async context manager, such as a semaphore, held only
+    around the live search so cache hits never queue behind it.
+    `time_left` is called once the slot is held and returns the seconds left
+    in the caller's overall deadline; the live search is capped by it.
+    """
+    key = _cache_key(query, max_results, timelimit)
+    now = datetime.now(timezone.utc)
+
+    # The cache goes through the async driver so a theme-wide fan-out of
+    # searches never blocks the event loop on MongoDB.
+    collection = get_async_db()[SearchCacheEntry._get_collection_name()]
+    cached = await collection.find_one(
+        {"key": key, "expires_at": {"$gt": now}}, {"results": 1}
+    )
+    if cached:
+        cache_stats["hits"] += 1
+        return cached["results"]
+    cache_stats["misses"] += 1
+
+    loop = asyncio.get_running_loop()
+    async with limit or nullcontext():
+        timeout = settings.search_query_timeout
+        if time_left is not None:
+            timeout = min(timeout, time_left())
+            if timeout <= 0:
+                raise asyncio.TimeoutError()
+        results = await asyncio.wait_for(
+            loop.run_in_executor(
+                _executor, _search_sync, query, max_results, timelimit
+            ),
+            timeout=timeout,
+        )
+
+    # Empty result sets are usually transient (rate limiting), so don't pin them.
+    if results:
+        await collection.update_one(
+            {"key": key},
+            {
+                "$set": {
+                    "query": query,
+                    "timelimit": timelimit,
+                    "max_results": max_results,
+                    "results": results,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=settings.search_cache_ttl),
+                }
+            },
+            upsert=True,
+        )
+    return results
@@ -1,25 +1,92 @@
-import aiohttp
+import hashlib
+import json
+import os
+import time
 from typing import Optional
-from bs4 import BeautifulSoup
 
+from ...config import settings
+from ...utils.disk_cache import DiskLRUCache
+from .extract import is_html_content_type
+from .http_client import http_client
+from .parse_pool import extract_text_async
+
+MAX_TEXT_CHARS = 6000  # Limit per source
+CHUNK_SIZE = 16 * 1024
+
+# Extracted page text plus validators, so unchanged pages cost a 304 round trip
+page_cache = DiskLRUCache(
+    os.path.join(settings.cache_dir, "pages"), settings.page_cache_max_bytes
+)
+
+
+def _load_cached_page(key: str) -> Optional[dict]:
+    raw = page_cache.get(key)
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        page_cache.delete(key)
+        return None
+
+
+async def fetch_url(url: str, force_refresh: bool = False) -> Optional[str]:
+    """Fetches a URL through the shared HTTP client and returns cleaned text.
+
+    Previously seen pages are revalidated with a conditional GET and served
+    from the page cache on 304. `force_refresh` skips the cache entirely.
+    """
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    cached = None if force_refresh else _load_cached_page(key)
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
 
-async def fetch_url(session: aiohttp.ClientSession, url: str) -> Optional[str]:
-    """Fetches a URL and returns cleaned text content."""
     try:
-        async with session.get(url, timeout=15) as response:
+        if not await http_client.is_allowed(url):
+            print(f"      ! Skipping {url}: disallowed by robots.txt")
+            return None
+
+        async with http_client.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return cached["text"]
             if response.status != 200:
                 print(f"      ! Failed to fetch {url}: Status {response.status}")
                 return None
-            html = await response.text()
-            soup = BeautifulSoup(html, "html.parser")
 
-            # Remove scripts, styles, nav, and footers
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
+            content_type = response.headers.get("Content-Type")
+            if not is_html_content_type(content_type):
+                print(f"      ! Skipping {url}: not HTML ({content_type})")
+                return None
+
+            # Read at most scrape_max_bytes so huge pages never sit in memory
+            # whole, then parse off the event loop on the shared pool.
+            chunks = []
+            received = 0
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= settings.scrape_max_bytes:
+                    break
+            html = b"".join(chunks)[: settings.scrape_max_bytes]
+            text = await extract_text_async(html, MAX_TEXT_CHARS, response.charset)
 
-            # Extract text
-            text = soup.get_text(separator=" ", strip=True)
-            return text[:6000]  # Limit per source
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                entry = {
+                    "url": url,
+                    "text": text,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "fetched_at": time.time(),
+                }
+                page_cache.set(key, json.dumps(entry).encode("utf-8"))
+            return text
     except Exception as e:
         print(f"      ! Error fetching {url}: {e}")
         return None
@@ -1,4 +1,7 @@
 import os
+from functools import lru_cache
+from typing import Type
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
@@ -12,19 +15,104 @@ class Settings(BaseSettings):
     app_name: str = "PostGenerator API"
     llm_provider: str = os.getenv("LLM_PROVIDER", "anthropic")
 
+    # Research concurrency budgets (shared across all requests)
+    research_search_concurrency: int = 4
+    research_scrape_concurrency: int = 16
+    research_llm_concurrency: int = 3
+    research_max_sources: int = 10
+    # Estimated shingle Jaccard similarity above which two pages count as copies
+    research_duplicate_threshold: float = 0.8
+
+    # Research synthesis context
+    research_context_tokens: int = 6000
+    research_chunk_tokens: int = 200
+
+    # Curriculum planning
+    planning_chunk_attempts: int = 3  # per outline/week call
+
+    # Web search
+    search_query_timeout: float = 10.0
+    search_deadline: float = 20.0
+    search_cache_ttl: int = 3 * 24 * 60 * 60  # seconds
+
+    # LLM response cache
+    llm_cache_ttl: int = 7 * 24 * 60 * 60  # seconds
+
+    # Scraping
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 4
+    http_dns_cache_ttl: int = 300  # seconds
+    http_request_timeout: float = 15.0
+    http_host_rate: float = 2.0  # requests per second per host
+    http_host_burst: float = 4.0
+    robots_cache_ttl: int = 6 * 60 * 60  # seconds
+    page_cache_max_bytes: int = 128 * 1024 * 1024
+    scrape_max_bytes: int = 2 * 1024 * 1024
+    html_parse_executor: str = "process"  # "process" or "thread"
+    html_parse_workers: int = 2
+
+    # Background jobs
+    job_concurrency: int = 2
+    job_max_attempts: int = 3
+    job_retry_backoff: float = 5.0
+
+    # Local on-disk caches
+    cache_dir: str = os.path.join(os.path.dirname(__file__), "../.cache")
+
+    # PDF export
+    pdf_max_pages: int = 4
+    pdf_browser_max_uses: int = 200
+    pdf_render_timeout: float = 30.0
+    pdf_cache_max_bytes: int = 256 * 1024 * 1024
+
     model_config = SettingsConfigDict(env_file="backend/.env", extra="ignore")
 
 
 settings = Settings()
 
 
-def get_llm(temperature: float = 0.7):
-    """Factory to get the configured LLM."""
+def get_llm_model() -> str:
+    """Returns the provider-qualified model name for the configured provider."""
     if settings.llm_provider == "groq":
         # Using Llama 3.3 70B as a high-quality open model on Groq
-        return init_chat_model("groq:llama-3.3-70b-versatile", temperature=temperature)
-    else:
-        # Default to Anthropic Haiku 4.5
-        return init_chat_model(
-            "anthropic:claude-haiku-4-5-20251001", temperature=temperature
-        )
+        return "groq:llama-3.3-70b-versatile"
+    # Default to Anthropic Haiku 4.5
+    return "anthropic:claude-haiku-4-5-20251001"
+
+
+@lru_cache(maxsize=None)
+def _build_llm(model: str, temperature: float):
+    return init_chat_model(model, temperature=temperature)
+
+
+@lru_cache(maxsize=None)
+def _build_structured_llm(model: str, temperature: float, schema: Type[BaseModel]):
+    return _build_llm(model, temperature).with_structured_output(schema)
+
+
+@lru_cache(maxsize=None)
+def _build_streaming_llm(model: str, temperature: float, schema: Type[BaseModel]):
+    # Forcing the schema as the only tool makes the JSON arrive as streamable
+    # tool-call argument chunks.
+    return _build_llm(model, temperature).bind_tools(
+        [schema], tool_choice=schema.__name__
+    )
+
+
+def get_llm(temperature: float = 0.7):
+    """Factory to get the configured LLM.
+
+    Clients are memoized per model and temperature, so their HTTP connection
+    pool is reused across requests instead of being rebuilt on every call.
+    """
+    return _build_llm(get_llm_model(), temperature)
+
+
+def get_structured_llm(schema: Type[BaseModel], temperature: float = 0.7):
+    """Returns a memoized runnable that parses the LLM output into `schema`."""
+    return _build_structured_llm(get_llm_model(), temperature, schema)
+
+
+def get_streaming_llm(schema: Type[BaseModel], temperature: float = 0.7):
+    """Returns a memoized runnable that streams `schema`-shaped tool calls."""
+    return _build_streaming_llm(get_llm_model(), temperature, schema)
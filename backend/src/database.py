@@ -1,12 +1,91 @@
-from mongoengine import connect, disconnect
+from typing import Any, Dict, Iterator, Optional, Set
+from mongoengine import connect, disconnect, get_db
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from .config import settings
+from .models.job import Job
+from .models.llm_cache import LLMCacheEntry
+from .models.post import Post
+from .models.search_cache import SearchCacheEntry
+from .models.theme import Theme
+
+# Async driver used by the Post/Theme data-access layer; mongoengine remains
+# the schema definition and is still used for the smaller auxiliary collections.
+_async_client: Optional[AsyncMongoClient] = None
 
 
 def connect_db():
+    global _async_client
     connect(host=settings.mongodb_uri)
+    _async_client = AsyncMongoClient(settings.mongodb_uri)
+    # These collections are accessed through the async driver, which never
+    # triggers mongoengine's lazy index creation, so do it explicitly.
+    Post.ensure_indexes()
+    Theme.ensure_indexes()
+    SearchCacheEntry.ensure_indexes()
+    LLMCacheEntry.ensure_indexes()
+    Job.ensure_indexes()
     print("Connected to MongoDB")
+    check_query_plans()
 
 
-def disconnect_db():
+async def disconnect_db():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
     disconnect()
     print("Disconnected from MongoDB")
+
+
+def _plan_stages(plan: Dict[str, Any]) -> Iterator[str]:
+    yield plan.get("stage", "")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def explain_hot_queries() -> Dict[str, Set[str]]:
+    """Returns the winning-plan stages of each hot post query, by name."""
+    collection = Post._get_collection()
+    probe = Theme.objects.only("id").first()
+    theme_id = probe.id if probe else None
+
+    queries = {
+        "calendar": collection.find({"theme": theme_id}).sort([("day", 1), ("_id", 1)]),
+        "theme research": collection.find({"theme": theme_id, "status": "planned"}),
+        "listing": collection.find({}).sort([("created_at", 1), ("_id", 1)]),
+    }
+    return {
+        name: set(_plan_stages(cursor.explain()["queryPlanner"]["winningPlan"]))
+        for name, cursor in queries.items()
+    }
+
+
+def check_query_plans() -> bool:
+    """Verifies via explain() that the hot post queries are served by an index.
+
+    Logs a warning for any query whose winning plan falls back to a COLLSCAN
+    or an in-memory SORT.
+    """
+    try:
+        plans = explain_hot_queries()
+    except Exception as e:
+        print(f"   ! Could not explain the hot post queries: {e}")
+        return True
+
+    healthy = True
+    for name, stages in plans.items():
+        if "COLLSCAN" in stages or "SORT" in stages:
+            healthy = False
+            print(f"   ! {name} query is not served by an index: {sorted(stages)}")
+    return healthy
+
+
+def get_async_db() -> AsyncDatabase:
+    """Returns the async handle to the same database mongoengine is bound to."""
+    if _async_client is None:
+        raise RuntimeError("Database is not connected")
+    return _async_client[get_db().name]
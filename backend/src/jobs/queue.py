@@ -0,0 +1,209 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import settings
+from ..models.job import Job
+from ..repositories import jobs as jobs_repo
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """A MongoDB-backed job queue drained by a bounded pool of asyncio workers.
+
+    Job state lives in the `jobs` collection, so queued work survives restarts
+    and can be polled or cancelled from any request. Every state change goes
+    through the async driver, so the queue never blocks the event loop.
+    """
+
+    def __init__(self, concurrency: int, max_attempts: int, retry_backoff: float):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._retry_timers: List[asyncio.Task] = []
+        self._stopping = False
+
+    def register(self, kind: str, handler: JobHandler):
+        """Registers the coroutine that executes jobs of `kind`."""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    async def start(self):
+        """Spawns the workers and re-queues jobs left over from a previous run."""
+        self._stopping = False
+        self._queue = asyncio.Queue()
+
+        # Anything still "running" was interrupted by a shutdown or crash.
+        await jobs_repo.update_jobs(
+            {"status": "running"}, {"status": "queued", "updated_at": _now()}
+        )
+        for job_id in await jobs_repo.find_job_ids({"status": "queued"}):
+            self._queue.put_nowait(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        print(f"Job queue started ({self.concurrency} workers)")
+
+    async def stop(self):
+        """Cancels workers; in-flight jobs are put back in the queue for next start."""
+        self._stopping = True
+        for task in [*self._retry_timers, *self._running.values(), *self._workers]:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._retry_timers = []
+        print("Job queue stopped")
+
+    async def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+    ) -> dict:
+        """Persists and enqueues a job, or returns the active job with the same key."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        key = idempotency_key or f"{kind}:{json.dumps(params, sort_keys=True)}"
+        existing = await jobs_repo.find_job(
+            {"idempotency_key": key, "status": {"$in": ACTIVE_STATUSES}}
+        )
+        if existing:
+            return existing
+
+        job = await jobs_repo.insert_job(
+            Job(
+                kind=kind,
+                params=params,
+                idempotency_key=key,
+                max_attempts=self.max_attempts,
+            )
+        )
+        self._enqueue(str(job["_id"]))
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancels a queued or running job. Finished jobs are left untouched."""
+        job = await jobs_repo.transition_job(
+            job_id,
+            ACTIVE_STATUSES,
+            {"status": "cancelled", "updated_at": _now(), "finished_at": _now()},
+        )
+        if job is None:
+            return await jobs_repo.get_job(job_id)
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    def _enqueue(self, job_id: str):
+        if self._queue is None:
+            # Not started (e.g. in a script); the next start() will pick it up.
+            return
+        self._queue.put_nowait(job_id)
+
+    async def _requeue_later(self, job_id: str, delay: float):
+        await asyncio.sleep(delay)
+        self._enqueue(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"   x Job worker error for {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # Atomically claim the job so a cancelled or duplicate entry is skipped.
+        job = await jobs_repo.transition_job(
+            job_id,
+            ["queued"],
+            {"status": "running", "started_at": _now(), "updated_at": _now()},
+            inc={"attempts": 1},
+        )
+        if job is None:
+            return
+
+        kind, attempts = job["kind"], job["attempts"]
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await self._finish(job_id, "failed", error=f"Unknown job kind: {kind}")
+            return
+
+        print(f"--- Job {job_id}: {kind} (attempt {attempts}) ---")
+        task = asyncio.create_task(handler(job.get("params", {})))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                await jobs_repo.transition_job(
+                    job_id, ["running"], {"status": "queued", "updated_at": _now()}
+                )
+                raise
+            # Cancelled through cancel(); status is already "cancelled".
+            print(f"   ! Job {job_id} cancelled.")
+        except Exception as e:
+            if attempts < job["max_attempts"]:
+                delay = self.retry_backoff * 2 ** (attempts - 1)
+                print(f"   ! Job {job_id} failed ({e}); retrying in {delay:.0f}s.")
+                requeued = await jobs_repo.transition_job(
+                    job_id,
+                    ["running"],
+                    {"status": "queued", "error": str(e), "updated_at": _now()},
+                )
+                if requeued:
+                    timer = asyncio.create_task(self._requeue_later(job_id, delay))
+                    self._retry_timers.append(timer)
+                    timer.add_done_callback(self._retry_timers.remove)
+            else:
+                print(f"   x Job {job_id} failed permanently: {e}")
+                await self._finish(job_id, "failed", error=str(e))
+        else:
+            print(f"   + Job {job_id} succeeded.")
+            await self._finish(job_id, "succeeded", result=result)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _finish(self, job_id: str, status: str, result: Any = None, error=None):
+        await jobs_repo.transition_job(
+            job_id,
+            ["running"],
+            {
+                "status": status,
+                "result": result,
+                "error": error,
+                "finished_at": _now(),
+                "updated_at": _now(),
+            },
+        )
+
+
+job_queue = JobQueue(
+    concurrency=settings.job_concurrency,
+    max_attempts=settings.job_max_attempts,
+    retry_backoff=settings.job_retry_backoff,
+)
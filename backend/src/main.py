@@ -1,20 +1,57 @@
 import os
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from .database import connect_db, disconnect_db
-from .routes import themes, posts
+from .routes import themes, posts, jobs, cache
 from .utils.security import verify_api_key
+from .utils.browser_pool import browser_pool
+from .jobs.queue import job_queue
+from .agents.tools.http_client import http_client
+from .agents.tools.parse_pool import shutdown_parse_executor
+from .agents.curriculum.agent import PLANNING_TEMPERATURE
+from .agents.curriculum.models import CurriculumOutline, CurriculumPlan
+from .agents.research.agent import SYNTHESIS_TEMPERATURE
+from .agents.research.models import ResearchSynthesis
+from .config import get_structured_llm
+
+
+def warm_llms():
+    """Builds the shared LLM clients up front so no request pays for the setup."""
+    for schema, temperature in [
+        (CurriculumOutline, PLANNING_TEMPERATURE),
+        (CurriculumPlan, PLANNING_TEMPERATURE),
+        (ResearchSynthesis, SYNTHESIS_TEMPERATURE),
+    ]:
+        try:
+            get_structured_llm(schema, temperature)
+        except Exception as e:
+            print(f"   ! Could not initialise LLM for {schema.__name__}: {e}")
+    print("LLM clients ready")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     connect_db()
+    warm_llms()
+    await http_client.start()
+    await browser_pool.start()
+    await job_queue.start()
     yield
-    disconnect_db()
+    await job_queue.stop()
+    await browser_pool.stop()
+    await http_client.stop()
+    shutdown_parse_executor()
+    await disconnect_db()
 
 
-app = FastAPI(title="PostGenerator API", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="PostGenerator API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # Configure CORS
 allowed_origin = os.getenv("CORS_ALLOWED_DOMAINS")
@@ -30,6 +67,8 @@ app.add_middleware(
 
 app.include_router(themes.router, dependencies=[Depends(verify_api_key)])
 app.include_router(posts.router, dependencies=[Depends(verify_api_key)])
+app.include_router(jobs.router, dependencies=[Depends(verify_api_key)])
+app.include_router(cache.router, dependencies=[Depends(verify_api_key)])
 
 
 @app.get("/")
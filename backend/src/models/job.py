@@ -0,0 +1,35 @@
+from mongoengine import (
+    Document,
+    StringField,
+    IntField,
+    DictField,
+    DynamicField,
+    DateTimeField,
+)
+from datetime import datetime, timezone
+
+
+class Job(Document):
+    kind = StringField(required=True)  # e.g. "research_post", "plan_theme"
+    params = DictField()
+    status = StringField(
+        default="queued",
+        choices=["queued", "running", "succeeded", "failed", "cancelled"],
+    )
+    # Re-submitting the same key while a job is still active returns that job
+    idempotency_key = StringField()
+
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=3)
+    result = DynamicField()
+    error = StringField()
+
+    created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    updated_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
+
+    meta = {
+        "collection": "jobs",
+        "indexes": [("idempotency_key", "status"), "status", "-created_at"],
+    }
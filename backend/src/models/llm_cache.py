@@ -0,0 +1,25 @@
+from mongoengine import (
+    Document,
+    StringField,
+    FloatField,
+    DictField,
+    DateTimeField,
+)
+from datetime import datetime, timezone
+
+
+class LLMCacheEntry(Document):
+    key = StringField(required=True, unique=True)  # hash of model/prompt/schema
+    model = StringField()
+    temperature = FloatField()
+    schema = StringField()
+    result = DictField()
+
+    created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    # MongoDB's TTL monitor removes the entry once this passes
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        "collection": "llm_cache",
+        "indexes": [{"fields": ["expires_at"], "expireAfterSeconds": 0}],
+    }
@@ -6,6 +6,7 @@ from mongoengine import (
     DateTimeField,
     IntField,
     DictField,
+    ObjectIdField,
 )
 from datetime import datetime, timezone
 
@@ -43,4 +44,22 @@ class Post(Document):
     difficulty = StringField()
     search_queries = ListField(StringField())
 
-    meta = {"collection": "posts", "indexes": ["theme", "status"]}
+    # Batch the post was planned in; a newer plan only retires older batches
+    plan_id = ObjectIdField()
+
+    # Bumped on every write; used for optimistic concurrency control
+    version = IntField(default=0)
+
+    meta = {
+        "collection": "posts",
+        "indexes": [
+            # Calendar: posts of a theme in (day, _id) keyset order (also serves
+            # theme-only lookups, so no separate single-field theme index)
+            ("theme", "day", "_id"),
+            # Theme research: planned posts of a theme
+            ("theme", "status"),
+            # Unfiltered listing in (created_at, _id) keyset order
+            ("created_at", "_id"),
+            "status",
+        ],
+    }
@@ -0,0 +1,26 @@
+from mongoengine import (
+    Document,
+    StringField,
+    IntField,
+    ListField,
+    DictField,
+    DateTimeField,
+)
+from datetime import datetime, timezone
+
+
+class SearchCacheEntry(Document):
+    key = StringField(required=True, unique=True)  # hash of query/timelimit/max
+    query = StringField()
+    timelimit = StringField()
+    max_results = IntField()
+    results = ListField(DictField())
+
+    created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    # MongoDB's TTL monitor removes the entry once this passes
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        "collection": "search_cache",
+        "indexes": [{"fields": ["expires_at"], "expireAfterSeconds": 0}],
+    }
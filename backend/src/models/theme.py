@@ -7,6 +7,7 @@ class Theme(Document):
     month = IntField(required=True, min_value=1, max_value=12)
     year = IntField(required=True)
     category = StringField(max_length=100)
+    version = IntField(default=0)
 
     meta = {
         "collection": "themes",
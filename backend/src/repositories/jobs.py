@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+
+from ..database import get_async_db
+from ..models.job import Job
+
+
+def _collection() -> AsyncCollection:
+    return get_async_db()[Job._get_collection_name()]
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    return await _collection().find_one({"_id": ObjectId(job_id)})
+
+
+async def find_job(query: Dict[str, Any]) -> Optional[dict]:
+    return await _collection().find_one(query)
+
+
+async def find_job_ids(query: Dict[str, Any]) -> List[str]:
+    """Ids of matching jobs, oldest first."""
+    cursor = _collection().find(query, {"_id": 1}).sort("created_at", 1)
+    return [str(doc["_id"]) async for doc in cursor]
+
+
+async def insert_job(job: Job) -> dict:
+    """Validates a mongoengine document and inserts it."""
+    job.validate()
+    data = job.to_mongo().to_dict()
+    result = await _collection().insert_one(data)
+    data["_id"] = result.inserted_id
+    return data
+
+
+async def transition_job(
+    job_id: str,
+    from_statuses: List[str],
+    fields: Dict[str, Any],
+    inc: Optional[Dict[str, int]] = None,
+) -> Optional[dict]:
+    """Atomically moves a job out of one of `from_statuses`.
+
+    Returns the updated document, or None if the job is missing or no longer
+    in one of those statuses (e.g. it was cancelled or claimed meanwhile).
+    """
+    update: Dict[str, Any] = {"$set": fields}
+    if inc:
+        update["$inc"] = inc
+    return await _collection().find_one_and_update(
+        {"_id": ObjectId(job_id), "status": {"$in": from_statuses}},
+        update,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def update_jobs(query: Dict[str, Any], fields: Dict[str, Any]) -> int:
+    result = await _collection().update_many(query, {"$set": fields})
+    return result.modified_count
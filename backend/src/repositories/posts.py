@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+
+from ..database import get_async_db
+from ..models.post import Post
+from ..utils.versioning import version_filter
+
+Sort = Sequence[Tuple[str, int]]
+
+
+def _collection() -> AsyncCollection:
+    return get_async_db()[Post._get_collection_name()]
+
+
+async def get_post(
+    post_id: str, projection: Optional[Dict[str, Any]] = None
+) -> Optional[dict]:
+    return await _collection().find_one({"_id": ObjectId(post_id)}, projection)
+
+
+async def find_posts(
+    query: Dict[str, Any],
+    sort: Optional[Sort] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    cursor = _collection().find(query, projection)
+    if sort:
+        cursor = cursor.sort(list(sort))
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(None)
+
+
+async def update_post(
+    post_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+) -> Optional[dict]:
+    """Sets `fields` and returns the updated document in a single round trip.
+
+    Every write bumps `version`. With `expected_version`, the update only
+    applies if nobody else has written since; None is returned when the
+    post is missing or the version has moved on.
+    """
+    query: Dict[str, Any] = {"_id": ObjectId(post_id)}
+    if expected_version is not None:
+        query.update(version_filter(expected_version))
+    return await _collection().find_one_and_update(
+        query,
+        {"$set": fields, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def insert_posts(posts: List[Post]) -> List[ObjectId]:
+    """Validates mongoengine documents and bulk-inserts them in one round trip."""
+    for post in posts:
+        post.validate()
+    result = await _collection().insert_many([p.to_mongo().to_dict() for p in posts])
+    return result.inserted_ids
+
+
+async def apply_plan_changes(
+    updates: List[Tuple[ObjectId, Dict[str, Any]]],
+    inserts: List[Post],
+    only_statuses: Sequence[str],
+) -> List[dict]:
+    """Writes replanned days and returns the documents that actually changed.
+
+    Each update only lands if the post is still in one of `only_statuses`,
+    so a post researched in the meantime is left alone. Updates run
+    concurrently and new days go in with one bulk insert.
+    """
+    for post in inserts:
+        post.validate()
+
+    collection = _collection()
+    updated = await asyncio.gather(
+        *[
+            collection.find_one_and_update(
+                {"_id": post_id, "status": {"$in": list(only_statuses)}},
+                {"$set": fields, "$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER,
+            )
+            for post_id, fields in updates
+        ]
+    )
+    written = [doc for doc in updated if doc is not None]
+
+    if inserts:
+        docs = [post.to_mongo().to_dict() for post in inserts]
+        await collection.insert_many(docs)
+        written.extend(docs)
+    return written
+
+
+async def delete_posts(query: Dict[str, Any]) -> int:
+    result = await _collection().delete_many(query)
+    return result.deleted_count
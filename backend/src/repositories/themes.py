@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+
+from ..database import get_async_db
+from ..models.theme import Theme
+from ..utils.versioning import version_filter
+
+Sort = Sequence[Tuple[str, int]]
+
+
+def _collection() -> AsyncCollection:
+    return get_async_db()[Theme._get_collection_name()]
+
+
+async def get_theme(theme_id: str) -> Optional[dict]:
+    return await _collection().find_one({"_id": ObjectId(theme_id)})
+
+
+async def find_theme(query: Dict[str, Any]) -> Optional[dict]:
+    return await _collection().find_one(query)
+
+
+async def find_themes(
+    query: Dict[str, Any],
+    sort: Optional[Sort] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    cursor = _collection().find(query, projection)
+    if sort:
+        cursor = cursor.sort(list(sort))
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(None)
+
+
+async def insert_theme(theme: Theme) -> dict:
+    """Validates a mongoengine document and inserts it. Raises DuplicateKeyError."""
+    theme.validate()
+    data = theme.to_mongo().to_dict()
+    result = await _collection().insert_one(data)
+    data["_id"] = result.inserted_id
+    return data
+
+
+async def update_theme(
+    theme_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+) -> Optional[dict]:
+    """Sets `fields` and returns the updated document in a single round trip.
+
+    Every write bumps `version`. With `expected_version`, the update only
+    applies if nobody else has written since; None is returned when the
+    theme is missing or the version has moved on.
+    """
+    query: Dict[str, Any] = {"_id": ObjectId(theme_id)}
+    if expected_version is not None:
+        query.update(version_filter(expected_version))
+    return await _collection().find_one_and_update(
+        query,
+        {"$set": fields, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def delete_theme(theme_id: str) -> bool:
+    result = await _collection().delete_one({"_id": ObjectId(theme_id)})
+    return result.deleted_count > 0
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from ..agents.llm_cache import cache_stats as llm_cache_stats
+from ..agents.tools.search import cache_stats as search_cache_stats
+from ..agents.tools.web import page_cache
+from .posts import pdf_generator
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats", response_model=dict)
+async def get_cache_stats():
+    """Hit/miss counters for the in-process caches since startup."""
+    return {
+        "search": dict(search_cache_stats),
+        "llm": dict(llm_cache_stats),
+        "pages": page_cache.stats(),
+        "pdf": pdf_generator.cache.stats(),
+    }
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, status
+from ..repositories import jobs as jobs_repo
+from ..schemas.job import JobCreate, JobResponse
+from ..jobs.queue import job_queue
+from bson import ObjectId
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def format_job(job: dict) -> dict:
+    data = dict(job)
+    data["id"] = str(data.pop("_id"))
+    data.pop("idempotency_key", None)
+    return data
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(job_in: JobCreate):
+    try:
+        job = await job_queue.submit(job_in.kind, job_in.params, job_in.idempotency_key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{e}. Available kinds: {', '.join(job_queue.kinds)}",
+        )
+    return format_job(job)
+
+
+@router.get("/{id}", response_model=JobResponse)
+async def get_job(id: str):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
+    job = await jobs_repo.get_job(id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return format_job(job)
+
+
+@router.post("/{id}/cancel", response_model=JobResponse)
+async def cancel_job(id: str):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
+    job = await job_queue.cancel(id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return format_job(job)
@@ -1,114 +1,206 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, status, Query, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
 from datetime import datetime
+import json
+import re
+import time
 from ..models.post import Post
-from ..models.theme import Theme
-from ..schemas.post import PostUpdate
+from ..repositories import posts as posts_repo
+from ..repositories import themes as themes_repo
+from ..schemas.post import PostUpdate, BulkExportRequest
+from ..agents.progress import ProgressCallback
 from ..agents.research.agent import research_single_topic
+from ..jobs.queue import job_queue
+from .jobs import format_job
 from ..utils.pdf_generator import PDFGenerator
-from mongoengine.errors import DoesNotExist, ValidationError
+from ..utils.pagination import after_cursor, decode_cursor, encode_cursor, parse_fields
+from ..utils.serializers import json_response, serialize_post
+from ..utils.sse import progress_stream
+from ..utils.versioning import parse_if_match
+from ..utils.zip_stream import ZipStreamWriter
 from bson import ObjectId
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 pdf_generator = PDFGenerator()
 
 
-def format_post(post: Post) -> dict:
-    data = post.to_mongo().to_dict()
-    data["id"] = str(data.pop("_id"))
-    if "theme" in data:
-        data["theme_id"] = str(data.pop("theme"))
-    if "created_at" in data:
-        data["created_at"] = data["created_at"].isoformat()
-    return data
+def _calendar_date(theme: Optional[dict], day: Optional[int]) -> Optional[str]:
+    if not theme:
+        return None
+    try:
+        # Handle cases where day might be missing (legacy/proposed posts)
+        return datetime(theme["year"], theme["month"], day or 1).isoformat()
+    except ValueError:
+        return None  # Invalid date
+
 
+# Minimal shape needed to draw the editorial calendar
+CALENDAR_FIELDS = ["title", "day", "status", "type"]
 
-@router.get("/", response_model=List[dict])
+
+@router.get("/")
 async def list_posts(
-    month: Optional[int] = Query(None), year: Optional[int] = Query(None)
+    month: Optional[int] = Query(None),
+    year: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    view: Optional[str] = Query(None, pattern="^calendar$"),
 ):
-    """List posts, optionally filtered by month and year via their Theme."""
+    """List posts, optionally filtered by month and year via their Theme.
+
+    Supports keyset pagination (`limit` + `cursor`, next page token returned in
+    the `X-Next-Cursor` header), a `fields=` projection and `view=calendar`.
+    """
     if month and year:
-        theme = Theme.objects(month=month, year=year).first()
+        theme = await themes_repo.find_theme({"month": month, "year": year})
         if not theme:
-            return []
-        posts = Post.objects(theme=theme)
+            return json_response([])
+        query = {"theme": theme["_id"]}
+        themes_by_id = {str(theme["_id"]): theme}
+        # Calendar order; stable across pages thanks to the _id tiebreaker
+        sort_fields = ["day", "_id"]
     else:
-        posts = Post.objects.all()
+        query = {}
+        themes_by_id = None
+        sort_fields = ["created_at", "_id"]
+
+    try:
+        requested = CALENDAR_FIELDS if view == "calendar" else []
+        requested = requested or parse_fields(fields, Post._fields.keys())
+        if cursor:
+            query.update(after_cursor(sort_fields, decode_cursor(cursor)))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    formatted_posts = []
-    for p in posts:
-        fp = format_post(p)
-        # Construct a 'date' field for the frontend calendar if we have the theme context
-        # Or if we fetched it, we can look up the theme.
-        # Since we fetched by theme above, we know the year/month.
-        # If listed all, we might need to fetch theme for each (inefficient) or rely on what we have.
+    projection = None
+    if requested:
+        # theme and day are always needed to build the calendar date
+        projection = {f: 1 for f in {*requested, "theme", "day", *sort_fields}}
+
+    posts = await posts_repo.find_posts(
+        query,
+        sort=[(f, 1) for f in sort_fields],
+        projection=projection,
+        limit=limit + 1 if limit else None,
+    )
+
+    headers = {}
+    if limit and len(posts) > limit:
+        posts = posts[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(
+            [posts[-1].get(f) for f in sort_fields]
+        )
 
-        # Optimization: If we fetched by theme, use that theme's year/month
-        current_theme = p.theme
-        # Note: mongoengine ReferenceField dereferences automatically if accessed,
-        # but 'p.theme' in the loop might trigger a query per post if not careful.
-        # However, for the calendar view, we usually fetch by month/year.
+    formatted_posts = [serialize_post(p) for p in posts]
 
-        if current_theme:
-            # Create ISO date string: YYYY-MM-DD
-            try:
-                # Handle cases where day might be missing (legacy/proposed posts)
-                day = p.day if p.day else 1
-                date_obj = datetime(current_theme.year, current_theme.month, day)
-                fp["date"] = date_obj.isoformat()
-            except ValueError:
-                fp["date"] = None  # Invalid date
+    if themes_by_id is None:
+        # One bulk query for every referenced theme instead of one per post
+        theme_ids = list({p["theme"] for p in posts if p.get("theme")})
+        themes = await themes_repo.find_themes(
+            {"_id": {"$in": theme_ids}}, projection={"year": 1, "month": 1}
+        )
+        themes_by_id = {str(t["_id"]): t for t in themes}
+
+    for fp in formatted_posts:
+        # Construct a 'date' field (YYYY-MM-DD) for the frontend calendar
+        theme = themes_by_id.get(fp.get("theme_id"))
+        if theme:
+            fp["date"] = _calendar_date(theme, fp.get("day"))
+
+    if requested:
+        # Sort keys were only projected for the cursor
+        keep = {"id", "theme_id", "date", *requested}
+        formatted_posts = [
+            {k: v for k, v in fp.items() if k in keep} for fp in formatted_posts
+        ]
+
+    return json_response(formatted_posts, headers=headers)
+
+
+async def research_and_save(
+    post: dict,
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """Runs deep research for a post and writes the synthesis back to it.
+
+    The write only applies if the post is still at the version that was
+    researched, so edits made while research ran are never overwritten.
+    """
+    research_data = await research_single_topic(
+        title=post["title"],
+        learning_objective=post.get("learning_objective") or "",
+        search_queries=post.get("search_queries") or [],
+        difficulty=post.get("difficulty") or "Beginner",
+        day=post.get("day") or 1,
+        force_refresh=force_refresh,
+        progress=progress,
+    )
+
+    updated = await posts_repo.update_post(
+        str(post["_id"]),
+        {
+            "sources": research_data.get("sources", []),
+            "hook": research_data.get("hook", ""),
+            "sections": research_data.get("sections", []),
+            "key_takeaways": research_data.get("key_takeaways", []),
+            "call_to_action": research_data.get("call_to_action", ""),
+            "hashtags": research_data.get("hashtags", []),
+            "status": "researched",
+        },
+        expected_version=post.get("version", 0),
+    )
+    if updated is None:
+        raise ValueError(f"Post {post['_id']} was modified or deleted during research")
+    return serialize_post(updated)
+
+
+async def _research_post_job(params: dict) -> dict:
+    post = await posts_repo.get_post(params["post_id"])
+    if not post:
+        raise ValueError(f"Post {params['post_id']} not found")
+    return await research_and_save(post, params.get("force_refresh", False))
 
-        formatted_posts.append(fp)
 
-    return formatted_posts
+job_queue.register("research_post", _research_post_job)
 
 
 @router.post("/{id}/research", response_model=dict, status_code=status.HTTP_200_OK)
-async def research_post(id: str):
+async def research_post(
+    id: str,
+    run_async: bool = Query(False, alias="async"),
+    refresh: bool = Query(False),
+):
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    post = Post.objects(id=id).first()
+    post = await posts_repo.get_post(id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
-    if not post.search_queries:
+    if not post.get("search_queries"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Post does not have search queries. Please (re)plan the theme first.",
         )
 
-    try:
-        # Call Agent
-        research_data = await research_single_topic(
-            title=post.title,
-            learning_objective=post.learning_objective or "",
-            search_queries=post.search_queries,
-            difficulty=post.difficulty or "Beginner",
-            day=post.day or 1,
+    if run_async:
+        job = await job_queue.submit(
+            "research_post", {"post_id": id, "force_refresh": refresh}
         )
-
-        # Update Post
-        post.update(
-            set__sources=research_data.get("sources", []),
-            set__hook=research_data.get("hook", ""),
-            set__sections=research_data.get("sections", []),
-            set__key_takeaways=research_data.get("key_takeaways", []),
-            set__call_to_action=research_data.get("call_to_action", ""),
-            set__hashtags=research_data.get("hashtags", []),
-            set__status="researched",
+        return json_response(
+            jsonable_encoder(format_job(job)), status_code=status.HTTP_202_ACCEPTED
         )
 
-        post.reload()
-        return format_post(post)
-
+    try:
+        return await research_and_save(post, force_refresh=refresh)
     except Exception as e:
         print(f"Deep research failed: {e}")
         raise HTTPException(
@@ -117,71 +209,140 @@ async def research_post(id: str):
         )
 
 
-@router.get("/{id}", response_model=dict)
-async def get_post(id: str):
+@router.get("/{id}/research/stream")
+async def stream_post_research(id: str, refresh: bool = Query(False)):
+    """Researches a post, streaming progress as Server-Sent Events.
+
+    Emits `stage`, `search`, `fetch` and `token` events while the run is in
+    flight and the updated post as a final `result` event. Disconnecting
+    cancels the run.
+    """
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    post = Post.objects(id=id).first()
+    post = await posts_repo.get_post(id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
-    return format_post(post)
+    if not post.get("search_queries"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Post does not have search queries. Please (re)plan the theme first.",
+        )
+
+    return progress_stream(
+        lambda progress: research_and_save(
+            post, force_refresh=refresh, progress=progress
+        )
+    )
 
 
-@router.patch("/{id}", response_model=dict)
-async def update_post(id: str, updates: PostUpdate):
+@router.get("/{id}")
+async def get_post(id: str):
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    post = Post.objects(id=id).first()
+    post = await posts_repo.get_post(id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
+    return json_response(serialize_post(post))
+
+
+@router.patch("/{id}", response_model=dict)
+async def update_post(
+    id: str, updates: PostUpdate, if_match: Optional[str] = Header(None)
+):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
     update_data = updates.model_dump(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+    try:
+        if expected_version is None:
+            expected_version = parse_if_match(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     if not update_data:
-        return format_post(post)
+        post = await posts_repo.get_post(id)
+        if not post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+            )
+        return serialize_post(post)
 
     try:
-        mongo_updates = {f"set__{k}": v for k, v in update_data.items()}
-        post.update(**mongo_updates)
-        post.reload()
-        return format_post(post)
+        updated = await posts_repo.update_post(id, update_data, expected_version)
+        if updated is None:
+            # Only the failure path pays for a second lookup.
+            if expected_version is not None and await posts_repo.get_post(
+                id, {"_id": 1}
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Post was modified by someone else; reload and retry.",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+            )
+        return serialize_post(updated)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
 @router.get("/{id}/export/pdf")
-async def export_post_pdf(id: str):
+async def export_post_pdf(id: str, if_none_match: Optional[str] = Header(None)):
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    post = Post.objects(id=id).first()
+    post = await posts_repo.get_post(id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
-    post_data = format_post(post)
+    post_data = serialize_post(post)
+    etag = f'"{pdf_generator.cache_key(post_data)}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
 
     try:
         pdf_bytes = await pdf_generator.generate_pdf(post_data)
 
-        filename = f"{post.title.replace(' ', '_')}_Carousel.pdf"
+        filename = f"{post['title'].replace(' ', '_')}_Carousel.pdf"
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                **cache_headers,
+            },
         )
     except Exception as e:
         print(f"PDF generation failed: {e}")
@@ -189,3 +350,96 @@ async def export_post_pdf(id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF generation failed: {str(e)}",
         )
+
+
+def _carousel_filename(post_data: dict) -> str:
+    title = re.sub(r"[^\w\-]+", "_", post_data.get("title") or "Untitled").strip("_")
+    day = post_data.get("day")
+    prefix = f"{day:02d}_" if isinstance(day, int) else ""
+    return f"{prefix}{title}_Carousel.pdf"
+
+
+async def _stream_carousel_zip(posts_data: List[dict]):
+    """Yields ZIP bytes as each carousel finishes, ending with a manifest."""
+    writer = ZipStreamWriter()
+    manifest = []
+    started = time.perf_counter()
+
+    async for post_data, pdf_bytes, error in pdf_generator.generate_many(posts_data):
+        entry = {
+            "id": post_data["id"],
+            "title": post_data.get("title"),
+            "day": post_data.get("day"),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        }
+        if error is None:
+            entry["file"], chunk = writer.add(_carousel_filename(post_data), pdf_bytes)
+            entry["status"] = "ok"
+            yield chunk
+        else:
+            entry["status"] = "failed"
+            entry["error"] = error
+            print(f"   ! Bulk export failed for {post_data['id']}: {error}")
+
+        manifest.append(entry)
+        print(f"   > Bulk export: {len(manifest)}/{len(posts_data)} done.")
+
+    failed = sum(1 for m in manifest if m["status"] == "failed")
+    summary = {"total": len(posts_data), "failed": failed, "posts": manifest}
+    _, chunk = writer.add("manifest.json", json.dumps(summary, indent=2).encode(), True)
+    yield chunk
+    yield writer.close()
+
+
+@router.post("/export")
+async def export_posts(request: BulkExportRequest):
+    """Exports many carousels at once, as a streamed ZIP or one merged PDF."""
+    if request.theme_id:
+        if not ObjectId.is_valid(request.theme_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+            )
+        query = {"theme": ObjectId(request.theme_id)}
+    elif request.post_ids:
+        if not all(ObjectId.is_valid(pid) for pid in request.post_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+            )
+        query = {"_id": {"$in": [ObjectId(pid) for pid in request.post_ids]}}
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either theme_id or post_ids.",
+        )
+
+    posts = await posts_repo.find_posts(query, sort=[("day", 1)])
+    posts_data = [serialize_post(p) for p in posts]
+    if not posts_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No posts to export"
+        )
+
+    if request.format == "pdf":
+        try:
+            pdf_bytes, failures = await pdf_generator.generate_merged_pdf(posts_data)
+        except Exception as e:
+            print(f"PDF generation failed: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"PDF generation failed: {str(e)}",
+            )
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": "attachment; filename=Carousels.pdf",
+                "X-Export-Total": str(len(posts_data)),
+                "X-Export-Failed": ",".join(f["id"] for f in failures),
+            },
+        )
+
+    return StreamingResponse(
+        _stream_carousel_zip(posts_data),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=Carousels.zip"},
+    )
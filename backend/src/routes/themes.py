@@ -1,88 +1,412 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Header
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, List, Optional
 from ..models.theme import Theme
 from ..models.post import Post
-from ..schemas.theme import ThemeCreate, ThemeUpdate, ThemeResponse
-from ..agents.curriculum.agent import plan_curriculum
-from mongoengine.errors import NotUniqueError, ValidationError, DoesNotExist
+from ..repositories import posts as posts_repo
+from ..repositories import themes as themes_repo
+from ..schemas.theme import ThemeCreate, ThemeUpdate, ThemeResponse, ReplanRequest
+from ..agents.curriculum.agent import plan_curriculum, replan_days
+from ..agents.progress import ProgressCallback
+from ..jobs.queue import job_queue
+from .jobs import format_job
+from .posts import research_and_save
+from ..utils.pagination import after_cursor, decode_cursor, encode_cursor
+from ..utils.serializers import json_response, serialize_post, serialize_theme
+from ..utils.sse import progress_stream
+from ..utils.versioning import parse_if_match
+from mongoengine.errors import ValidationError
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
+import asyncio
+import calendar
+import time
 
 router = APIRouter(prefix="/themes", tags=["Themes"])
 
+# Posts that carry no research or scheduling yet and may be regenerated
+REPLANNABLE_STATUSES = ["proposed", "planned"]
 
-def format_theme(theme: Theme) -> dict:
-    """Helper to convert MongoEngine document to dict for Pydantic."""
-    data = theme.to_mongo().to_dict()
-    data["id"] = str(data.pop("_id"))
-    return data
 
+async def _plan_and_save(
+    theme: dict,
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> List[dict]:
+    """Generates the month's curriculum and replaces the theme's posts with it.
 
-def format_post(post: Post) -> dict:
-    data = post.to_mongo().to_dict()
-    data["id"] = str(data.pop("_id"))
-    # Ensure theme is converted to string and removed from data
-    if "theme" in data:
-        data["theme_id"] = str(data.pop("theme"))
-    if "created_at" in data:
-        data["created_at"] = data["created_at"].isoformat()
-    return data
+    The new plan is written first with one bulk insert and the previous posts
+    are only removed afterwards, so a failure never leaves the theme empty.
+    Each plan is tagged with an increasing `plan_id` and only retires batches
+    older than itself, so overlapping runs can't delete each other's plans.
+    """
+    # Call Agent
+    generated_data = await plan_curriculum(
+        theme["title"],
+        theme["month"],
+        theme["year"],
+        force_refresh=force_refresh,
+        progress=progress,
+    )
+    if not generated_data:
+        raise RuntimeError("Planning agent returned no topics")
+
+    # ObjectIds increase over time, so later plans get larger batch ids
+    plan_id = ObjectId()
+    new_posts = [
+        Post(
+            # Ids are assigned up front so a failed insert can be rolled back
+            id=ObjectId(),
+            plan_id=plan_id,
+            title=item["title"],
+            type=item["type"],
+            day=item["day"],
+            learning_objective=item["learning_objective"],
+            difficulty=item["difficulty"],
+            search_queries=item["search_queries"],
+            theme=theme["_id"],
+            status="planned",
+        )
+        for item in generated_data
+    ]
+
+    new_ids = [post.id for post in new_posts]
+    try:
+        await posts_repo.insert_posts(new_posts)
+    except Exception:
+        # insert_many is ordered; drop whatever part of the new plan landed
+        await posts_repo.delete_posts({"_id": {"$in": new_ids}})
+        raise
+
+    # Swap: retire older plans only once the new one is stored. A concurrent
+    # newer plan is left alone; it will retire this one instead.
+    await posts_repo.delete_posts(
+        {
+            "theme": theme["_id"],
+            "$or": [{"plan_id": {"$lt": plan_id}}, {"plan_id": None}],
+        }
+    )
+
+    return [serialize_post(post.to_mongo().to_dict()) for post in new_posts]
+
+
+async def _plan_theme_job(params: dict) -> dict:
+    theme = await themes_repo.get_theme(params["theme_id"])
+    if not theme:
+        raise ValueError(f"Theme {params['theme_id']} not found")
+    return {"posts": await _plan_and_save(theme, params.get("force_refresh", False))}
+
+
+job_queue.register("plan_theme", _plan_theme_job)
 
 
 @router.post(
     "/{id}/plan", response_model=List[dict], status_code=status.HTTP_201_CREATED
 )
-async def plan_theme_curriculum(id: str):
+async def plan_theme_curriculum(
+    id: str,
+    run_async: bool = Query(False, alias="async"),
+    refresh: bool = Query(False),
+):
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    theme = Theme.objects(id=id).first()
+    theme = await themes_repo.get_theme(id)
     if not theme:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
         )
 
-    # Clear existing posts for this theme to avoid mess during planning
-    # (Optional, but often preferred for "Regenerate Plan")
-    Post.objects(theme=theme).delete()
+    if run_async:
+        job = await job_queue.submit(
+            "plan_theme", {"theme_id": id, "force_refresh": refresh}
+        )
+        return json_response(
+            jsonable_encoder(format_job(job)), status_code=status.HTTP_202_ACCEPTED
+        )
 
     try:
-        # Call Agent
-        generated_data = await plan_curriculum(theme.title, theme.month, theme.year)
-
-        saved_posts = []
-        for item in generated_data:
-            post = Post(
-                title=item["title"],
-                type=item["type"],
-                day=item["day"],
-                learning_objective=item["learning_objective"],
-                difficulty=item["difficulty"],
-                search_queries=item["search_queries"],
-                theme=theme,
-                status="planned",
+        return await _plan_and_save(theme, force_refresh=refresh)
+    except Exception as e:
+        print(f"Curriculum planning failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Planning agent failed: {str(e)}",
+        )
+
+
+async def _replan_targets(theme: dict, days: List[int]):
+    """Loads the theme's dated posts and splits `days` into replannable and skipped.
+
+    Raises ValueError if a day is outside the month or nothing can be replanned.
+    """
+    num_days = calendar.monthrange(theme["year"], theme["month"])[1]
+    out_of_range = [day for day in days if not 1 <= day <= num_days]
+    if out_of_range:
+        raise ValueError(f"Days {out_of_range} are outside of a {num_days}-day month")
+
+    existing = await posts_repo.find_posts(
+        {"theme": theme["_id"], "day": {"$ne": None}},
+        sort=[("day", 1), ("_id", 1)],
+        projection={"title": 1, "day": 1, "status": 1, "plan_id": 1},
+    )
+    posts_by_day: Dict[int, dict] = {}
+    for post in existing:
+        posts_by_day.setdefault(post["day"], post)
+
+    skipped = [
+        day
+        for day in days
+        if day in posts_by_day
+        and posts_by_day[day].get("status") not in REPLANNABLE_STATUSES
+    ]
+    targets = [day for day in days if day not in skipped]
+    if not targets:
+        raise ValueError("None of the requested days can be replanned")
+    return existing, posts_by_day, targets, skipped
+
+
+async def _replan_and_save(
+    theme: dict,
+    days: List[int],
+    force_refresh: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """Regenerates the given days of a theme's plan and leaves every other post alone.
+
+    Days whose post has moved past planning (researched, scheduled, ...) are
+    kept as they are and reported back as skipped.
+    """
+    existing, posts_by_day, targets, skipped = await _replan_targets(theme, days)
+
+    generated = await replan_days(
+        theme["title"],
+        theme["month"],
+        theme["year"],
+        targets,
+        current_plan={day: post["title"] for day, post in posts_by_day.items()},
+        force_refresh=force_refresh,
+        progress=progress,
+    )
+    if not generated:
+        raise RuntimeError("Planning agent returned no topics")
+
+    # New days join the current plan, so a later full replan retires them too
+    plan_ids = [post["plan_id"] for post in existing if post.get("plan_id")]
+    plan_id = max(plan_ids) if plan_ids else None
+
+    updates, inserts = [], []
+    for item in generated:
+        fields = {
+            "title": item["title"],
+            "type": item["type"],
+            "learning_objective": item["learning_objective"],
+            "difficulty": item["difficulty"],
+            "search_queries": item["search_queries"],
+            "status": "planned",
+        }
+        current = posts_by_day.get(item["day"])
+        if current:
+            updates.append((current["_id"], fields))
+        else:
+            inserts.append(
+                Post(
+                    id=ObjectId(),
+                    plan_id=plan_id,
+                    day=item["day"],
+                    theme=theme["_id"],
+                    **fields,
+                )
             )
-            post.save()
-            saved_posts.append(format_post(post))
 
-        return saved_posts
+    written = await posts_repo.apply_plan_changes(
+        updates, inserts, REPLANNABLE_STATUSES
+    )
+    written.sort(key=lambda post: post["day"])
+
+    # Days whose post left the planned state while the LLM was running
+    written_days = {post["day"] for post in written}
+    skipped.extend(
+        item["day"]
+        for item in generated
+        if item["day"] not in written_days and item["day"] not in skipped
+    )
+    return {
+        "posts": [serialize_post(post) for post in written],
+        "skipped_days": sorted(skipped),
+    }
+
+
+async def _replan_theme_job(params: dict) -> dict:
+    theme = await themes_repo.get_theme(params["theme_id"])
+    if not theme:
+        raise ValueError(f"Theme {params['theme_id']} not found")
+    return await _replan_and_save(
+        theme, params["days"], params.get("force_refresh", False)
+    )
+
+
+job_queue.register("replan_theme", _replan_theme_job)
 
+
+@router.post("/{id}/replan", response_model=dict)
+async def replan_theme_days(
+    id: str,
+    request: ReplanRequest,
+    run_async: bool = Query(False, alias="async"),
+    refresh: bool = Query(False),
+):
+    """Regenerates selected days of the plan with the rest of the month as context."""
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
+    theme = await themes_repo.get_theme(id)
+    if not theme:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
+        )
+
+    days = request.resolve()
+    if run_async:
+        # Reject what the job could never do up front instead of letting the
+        # queue retry it; the job re-checks against the state it runs on.
+        try:
+            await _replan_targets(theme, days)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        job = await job_queue.submit(
+            "replan_theme", {"theme_id": id, "days": days, "force_refresh": refresh}
+        )
+        return json_response(
+            jsonable_encoder(format_job(job)), status_code=status.HTTP_202_ACCEPTED
+        )
+
+    try:
+        return await _replan_and_save(theme, days, force_refresh=refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        print(f"Curriculum planning failed: {e}")
+        print(f"Curriculum replanning failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Planning agent failed: {str(e)}",
         )
 
 
+@router.get("/{id}/plan/stream")
+async def stream_theme_plan(id: str, refresh: bool = Query(False)):
+    """Plans a theme's curriculum, streaming progress as Server-Sent Events.
+
+    Emits `stage` and `token` events while the plan is generated and the new
+    posts as a final `result` event. Disconnecting cancels the run.
+    """
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
+    theme = await themes_repo.get_theme(id)
+    if not theme:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
+        )
+
+    return progress_stream(
+        lambda progress: _plan_and_save(theme, force_refresh=refresh, progress=progress)
+    )
+
+
+async def _research_theme(theme: dict, force_refresh: bool = False) -> dict:
+    """Researches every planned post of a theme concurrently.
+
+    Stage-level semaphores in the research agent bound the actual load; each
+    post is saved as soon as its own research finishes.
+    """
+    posts = await posts_repo.find_posts(
+        {"theme": theme["_id"], "status": "planned"}, sort=[("day", 1)]
+    )
+    posts = [p for p in posts if p.get("search_queries")]
+    print(f"--- Researching theme {theme['title']}: {len(posts)} posts ---")
+    started = time.perf_counter()
+
+    async def research_one(post: dict) -> dict:
+        post_started = time.perf_counter()
+        report = {
+            "id": str(post["_id"]),
+            "day": post.get("day"),
+            "title": post["title"],
+        }
+        try:
+            await research_and_save(post, force_refresh=force_refresh)
+            report["status"] = "ok"
+        except Exception as e:
+            print(f"   x Research failed for day {post.get('day')}: {e}")
+            report["status"] = "failed"
+            report["error"] = str(e)
+        report["elapsed_ms"] = round((time.perf_counter() - post_started) * 1000)
+        return report
+
+    reports = await asyncio.gather(*[research_one(p) for p in posts])
+    failed = sum(1 for r in reports if r["status"] == "failed")
+    return {
+        "theme_id": str(theme["_id"]),
+        "total": len(reports),
+        "succeeded": len(reports) - failed,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        "posts": reports,
+    }
+
+
+async def _research_theme_job(params: dict) -> dict:
+    theme = await themes_repo.get_theme(params["theme_id"])
+    if not theme:
+        raise ValueError(f"Theme {params['theme_id']} not found")
+    return await _research_theme(theme, params.get("force_refresh", False))
+
+
+job_queue.register("research_theme", _research_theme_job)
+
+
+@router.post("/{id}/research", response_model=dict)
+async def research_theme(
+    id: str,
+    run_async: bool = Query(False, alias="async"),
+    refresh: bool = Query(False),
+):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
+        )
+
+    theme = await themes_repo.get_theme(id)
+    if not theme:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
+        )
+
+    if run_async:
+        job = await job_queue.submit(
+            "research_theme", {"theme_id": id, "force_refresh": refresh}
+        )
+        return json_response(
+            jsonable_encoder(format_job(job)), status_code=status.HTTP_202_ACCEPTED
+        )
+
+    return await _research_theme(theme, force_refresh=refresh)
+
+
 @router.post("/", response_model=ThemeResponse, status_code=status.HTTP_201_CREATED)
 async def create_theme(theme_in: ThemeCreate):
     try:
-        theme = Theme(**theme_in.model_dump())
-        theme.save()
-        return format_theme(theme)
-    except NotUniqueError:
+        theme = await themes_repo.insert_theme(Theme(**theme_in.model_dump()))
+        return serialize_theme(theme)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Theme already exists for {theme_in.month}/{theme_in.year}",
@@ -95,52 +419,87 @@ async def create_theme(theme_in: ThemeCreate):
         )
 
 
-@router.get("/", response_model=List[ThemeResponse])
-async def list_themes():
-    themes = Theme.objects.all()
-    return [format_theme(t) for t in themes]
+@router.get("/")
+async def list_themes(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+):
+    """List themes in creation order, optionally one page at a time.
+
+    The next page token, if any, is returned in the `X-Next-Cursor` header.
+    """
+    query = {}
+    if cursor:
+        try:
+            query = after_cursor(["_id"], decode_cursor(cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    themes = await themes_repo.find_themes(
+        query, sort=[("_id", 1)], limit=limit + 1 if limit else None
+    )
+    headers = {}
+    if limit and len(themes) > limit:
+        themes = themes[:limit]
+        headers["X-Next-Cursor"] = encode_cursor([themes[-1]["_id"]])
+
+    return json_response([serialize_theme(t) for t in themes], headers=headers)
 
 
 @router.get("/{year}/{month}", response_model=ThemeResponse)
 async def get_theme_by_date(year: int, month: int):
-    theme = Theme.objects(year=year, month=month).first()
+    theme = await themes_repo.find_theme({"year": year, "month": month})
     if not theme:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No theme found for {month}/{year}",
         )
-    return format_theme(theme)
+    return serialize_theme(theme)
 
 
 @router.patch("/{id}", response_model=ThemeResponse)
-async def update_theme(id: str, theme_in: ThemeUpdate):
+async def update_theme(
+    id: str, theme_in: ThemeUpdate, if_match: Optional[str] = Header(None)
+):
     if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    theme = Theme.objects(id=id).first()
-    if not theme:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
-        )
-
     update_data = theme_in.model_dump(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+    try:
+        if expected_version is None:
+            expected_version = parse_if_match(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     if not update_data:
-        return format_theme(theme)
+        theme = await themes_repo.get_theme(id)
+        if not theme:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
+            )
+        return serialize_theme(theme)
 
     try:
-        # Use reload to ensure we return the latest data from DB
-        theme.update(**update_data)
-        theme.reload()
-        return format_theme(theme)
-    except NotUniqueError:
+        updated = await themes_repo.update_theme(id, update_data, expected_version)
+        if updated is None:
+            # Only the failure path pays for a second lookup.
+            if expected_version is not None and await themes_repo.get_theme(id):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Theme was modified by someone else; reload and retry.",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
+            )
+        return serialize_theme(updated)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Update failed: A theme already exists for that month/year.",
         )
-    except ValidationError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -150,10 +509,10 @@ async def delete_theme(id: str):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format"
         )
 
-    theme = Theme.objects(id=id).first()
+    theme = await themes_repo.get_theme(id)
     if not theme:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found"
         )
-    theme.delete()
+    await themes_repo.delete_theme(id)
     return None
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+    idempotency_key: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -73,6 +73,8 @@ class PostUpdate(BaseModel):
     learning_objective: Optional[str] = None
     difficulty: Optional[str] = None
     search_queries: Optional[List[str]] = None
+    # Version the client last saw; the update is rejected if it has moved on
+    version: Optional[int] = None
 
 
 class PostResponse(PostBase):
@@ -82,3 +84,9 @@ class PostResponse(PostBase):
 
     class Config:
         from_attributes = True
+
+
+class BulkExportRequest(BaseModel):
+    theme_id: Optional[str] = None
+    post_ids: Optional[List[str]] = None
+    format: str = Field("zip", pattern="^(zip|pdf)$")
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 
 
 class ThemeBase(BaseModel):
@@ -20,10 +20,37 @@ class ThemeUpdate(BaseModel):
     month: Optional[int] = Field(None, ge=1, le=12)
     year: Optional[int] = Field(None, ge=2000)
     category: Optional[str] = Field(None, max_length=100)
+    # Version the client last saw; the update is rejected if it has moved on
+    version: Optional[int] = None
 
 
 class ThemeResponse(ThemeBase):
     id: str
+    version: int = 0
 
     class Config:
         from_attributes = True
+
+
+class ReplanRequest(BaseModel):
+    """Days to regenerate: an explicit list, an inclusive range, or both."""
+
+    days: List[int] = Field(default_factory=list)
+    start_day: Optional[int] = Field(None, ge=1, le=31)
+    end_day: Optional[int] = Field(None, ge=1, le=31)
+
+    @model_validator(mode="after")
+    def check_days(self):
+        if (self.start_day is None) != (self.end_day is None):
+            raise ValueError("start_day and end_day must be given together")
+        if self.start_day is not None and self.start_day > self.end_day:
+            raise ValueError("start_day must not be after end_day")
+        if not self.days and self.start_day is None:
+            raise ValueError("Provide days or a start_day/end_day range")
+        return self
+
+    def resolve(self) -> List[int]:
+        days = set(self.days)
+        if self.start_day is not None:
+            days.update(range(self.start_day, self.end_day + 1))
+        return sorted(days)
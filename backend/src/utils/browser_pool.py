@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import Browser, Page, Playwright, async_playwright
+
+from ..config import settings
+
+
+class BrowserPool:
+    """Keeps one warm headless Chromium alive and hands out reusable pages."""
+
+    def __init__(self, max_pages: int, max_uses: int, viewport: dict):
+        self.max_pages = max_pages
+        self.max_uses = max_uses
+        self.viewport = viewport
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._idle_pages: List[Page] = []
+        self._active = 0
+        self._uses = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        """Starts Playwright and launches the shared browser.
+
+        A failed launch (e.g. Chromium not installed) is logged rather than
+        raised, so only PDF export is affected; the next checkout retries.
+        """
+        async with self._lock:
+            try:
+                await self._ensure_browser()
+            except Exception as e:
+                print(f"   ! Browser pool: could not launch browser: {e}")
+                await self._stop_playwright()
+                return
+        print("Browser pool started")
+
+    async def stop(self):
+        """Closes every page, the browser and the Playwright driver."""
+        async with self._lock:
+            await self._close_browser()
+            await self._stop_playwright()
+        print("Browser pool stopped")
+
+    async def _stop_playwright(self):
+        # Caller must hold self._lock.
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                print(f"   ! Browser pool: error stopping Playwright: {e}")
+            self._playwright = None
+
+    async def _ensure_browser(self) -> Browser:
+        # Caller must hold self._lock.
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        crashed = self._browser is not None and not self._browser.is_connected()
+        # Recycle a long-lived browser only once nothing is rendering on it,
+        # which caps slow memory growth inside Chromium.
+        worn_out = self._uses >= self.max_uses and self._active == 0
+
+        if self._browser is None or crashed or worn_out:
+            if crashed:
+                print("   ! Browser pool: browser disconnected, relaunching.")
+            await self._close_browser()
+            try:
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            except Exception:
+                # Don't leave the driver process running without a browser.
+                await self._stop_playwright()
+                raise
+            self._uses = 0
+
+        return self._browser
+
+    async def _close_browser(self):
+        # Caller must hold self._lock.
+        self._idle_pages.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"   ! Browser pool: error closing browser: {e}")
+            self._browser = None
+
+    async def _checkout_page(self) -> Page:
+        async with self._lock:
+            browser = await self._ensure_browser()
+            self._uses += 1
+            self._active += 1
+
+            while self._idle_pages:
+                page = self._idle_pages.pop()
+                if not page.is_closed() and page.context.browser is browser:
+                    return page
+
+        try:
+            context = await browser.new_context(viewport=self.viewport)
+            return await context.new_page()
+        except Exception:
+            self._active -= 1
+            raise
+
+    async def _release_page(self, page: Page, healthy: bool):
+        async with self._lock:
+            self._active -= 1
+            reusable = (
+                healthy
+                and not page.is_closed()
+                and self._browser is not None
+                and page.context.browser is self._browser
+                and self._uses < self.max_uses
+            )
+            if reusable:
+                self._idle_pages.append(page)
+                return
+
+        try:
+            await page.context.close()
+        except Exception:
+            # The browser may already be gone; nothing left to clean up.
+            pass
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Yields a warm page, waiting if `max_pages` renders are in flight.
+
+        Pages that raise during use are discarded rather than returned to the
+        pool, so a crashed or wedged tab is never handed out again.
+        """
+        async with self._semaphore:
+            page = await self._checkout_page()
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                await self._release_page(page, healthy)
+
+
+browser_pool = BrowserPool(
+    max_pages=settings.pdf_max_pages,
+    max_uses=settings.pdf_browser_max_uses,
+    viewport={"width": 1080, "height": 1080},
+)
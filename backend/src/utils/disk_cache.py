@@ -0,0 +1,110 @@
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class DiskLRUCache:
+    """A size-bounded, least-recently-used byte store backed by a directory.
+
+    Keys must be filesystem-safe (hex digests in practice). The in-memory index
+    is rebuilt from file access times on startup, so recency survives restarts.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name.endswith(".tmp"):
+                # Leftover from an interrupted write.
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_atime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total_bytes += size
+
+        self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the stored bytes for `key`, or None on a miss."""
+        if key not in self._index:
+            self.misses += 1
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Removed behind our back; forget it.
+            self._total_bytes -= self._index.pop(key)
+            self.misses += 1
+            return None
+
+        self._index.move_to_end(key)
+        os.utime(self._path(key))
+        self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes):
+        """Stores `data` under `key`, evicting the oldest entries if needed."""
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        if key in self._index:
+            self._total_bytes -= self._index.pop(key)
+        self._index[key] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def delete(self, key: str):
+        if key not in self._index:
+            return
+        self._total_bytes -= self._index.pop(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,51 @@
+import base64
+from typing import Any, Dict, Iterable, List, Optional
+from bson import json_util
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Packs the sort-key values of the last returned item into an opaque token."""
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Inverse of `encode_cursor`. Raises ValueError on a malformed token."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def after_cursor(sort_fields: List[str], values: List[Any]) -> Dict[str, Any]:
+    """Builds a raw MongoDB filter selecting items strictly after `values`.
+
+    Assumes ascending order on every field, e.g. for ("day", "_id"):
+    day > v0 OR (day == v0 AND _id > v1).
+
+    MongoDB sorts null/missing before any other value, but `{"$gt": null}`
+    matches nothing, so "after null" is expressed as `{"$ne": null}`.
+    """
+    if len(values) != len(sort_fields):
+        raise ValueError("Cursor does not match the requested ordering")
+
+    clauses = []
+    for i, field in enumerate(sort_fields):
+        clause = {sort_fields[j]: values[j] for j in range(i)}
+        clause[field] = {"$gt": values[i]} if values[i] is not None else {"$ne": None}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> List[str]:
+    """Splits a comma-separated `fields=` parameter and validates each name."""
+    if not fields:
+        return []
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
@@ -1,15 +1,56 @@
+import asyncio
+import hashlib
+import io
+import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader
-from playwright.async_api import async_playwright
+from pypdf import PdfWriter
+
+from ..config import settings
+from .browser_pool import browser_pool
+from .disk_cache import DiskLRUCache
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "pdf_templates")
+TEMPLATE_NAME = "carousel_template.html"
+
+
+def _merge_pdfs(pdfs: List[bytes]) -> bytes:
+    """Concatenates rendered carousels into one document."""
+    writer = PdfWriter()
+    for pdf_bytes in pdfs:
+        writer.append(io.BytesIO(pdf_bytes))
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
 
 
 class PDFGenerator:
     def __init__(self):
         self.env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-        self.template = self.env.get_template("carousel_template.html")
+        self.template = self.env.get_template(TEMPLATE_NAME)
+        self.cache = DiskLRUCache(
+            os.path.join(settings.cache_dir, "pdf"), settings.pdf_cache_max_bytes
+        )
+
+        # Any edit to the template changes every cache key, so stale renders
+        # are never served after a redesign.
+        with open(os.path.join(TEMPLATE_DIR, TEMPLATE_NAME), "rb") as f:
+            self.template_version = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    def _slides_key(self, slides: List[Dict[str, Any]], author: str) -> str:
+        payload = json.dumps(
+            {"slides": slides, "author": author, "template": self.template_version},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cache_key(
+        self, post_data: Dict[str, Any], author: str = "Aditya Kulkarni"
+    ) -> str:
+        """Content hash of the rendered carousel; doubles as the HTTP ETag."""
+        return self._slides_key(self._map_post_to_slides(post_data, author), author)
 
     def _map_post_to_slides(
         self, post_data: Dict[str, Any], author: str = "Aditya Kulkarni"
@@ -97,27 +138,93 @@ class PDFGenerator:
         self, post_data: Dict[str, Any], author: str = "Aditya Kulkarni"
     ) -> bytes:
         slides = self._map_post_to_slides(post_data, author)
-        html_content = self.template.render(slides=slides)
+        return await self._generate_from_slides(slides, author)
+
+    async def generate_merged_pdf(
+        self, posts_data: List[Dict[str, Any]], author: str = "Aditya Kulkarni"
+    ) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """Renders several posts back to back into a single PDF document.
+
+        Each post is rendered on its own (and cached) before the carousels are
+        merged, so a post that fails or times out is left out and reported in
+        the returned failures list instead of aborting the whole document.
+        """
+        results = {}
+        async for post_data, pdf_bytes, error in self.generate_many(posts_data, author):
+            results[id(post_data)] = (pdf_bytes, error)
+
+        pdfs, failures = [], []
+        for post_data in posts_data:
+            pdf_bytes, error = results[id(post_data)]
+            if error is None:
+                pdfs.append(pdf_bytes)
+            else:
+                failures.append({"id": post_data.get("id"), "error": error})
+
+        if not pdfs:
+            raise RuntimeError("None of the carousels could be rendered")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _merge_pdfs, pdfs), failures
+
+    async def generate_many(
+        self, posts_data: List[Dict[str, Any]], author: str = "Aditya Kulkarni"
+    ) -> AsyncIterator[Tuple[Dict[str, Any], Optional[bytes], Optional[str]]]:
+        """Renders carousels concurrently, yielding (post, pdf, error) as each finishes.
+
+        Concurrency is bounded by the browser pool, so every render shares the
+        same warm browser. A failing post yields an error instead of raising.
+        """
+
+        async def render_one(post_data):
+            try:
+                return post_data, await self.generate_pdf(post_data, author), None
+            except Exception as e:
+                # Timeouts stringify to "", which says nothing in a manifest.
+                return post_data, None, str(e) or type(e).__name__
+
+        tasks = [asyncio.create_task(render_one(p)) for p in posts_data]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer may stop early (e.g. client disconnect).
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_from_slides(
+        self, slides: List[Dict[str, Any]], author: str
+    ) -> bytes:
+        key = self._slides_key(slides, author)
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
-            # Set viewport to match our slide size (1080x1080)
-            await page.set_viewport_size({"width": 1080, "height": 1080})
+        pdf_bytes = await self._render(self.template.render(slides=slides))
+        self.cache.set(key, pdf_bytes)
+        return pdf_bytes
 
-            # Set content and wait for it to be rendered
-            await page.set_content(html_content, wait_until="networkidle")
+    async def _render(self, html_content: str) -> bytes:
+        async with browser_pool.page() as page:
+            # The template is fully self-contained, so waiting for "load" is
+            # enough; "networkidle" would add a fixed idle delay per export.
+            await page.set_content(html_content, wait_until="load")
 
             # Generate PDF with exact dimensions
-            pdf_bytes = await page.pdf(
-                print_background=True,
-                width="1080px",
-                height="1080px",
-                margin={"top": "0px", "right": "0px", "bottom": "0px", "left": "0px"},
-                display_header_footer=False,
-                prefer_css_page_size=True,
+            return await asyncio.wait_for(
+                page.pdf(
+                    print_background=True,
+                    width="1080px",
+                    height="1080px",
+                    margin={
+                        "top": "0px",
+                        "right": "0px",
+                        "bottom": "0px",
+                        "left": "0px",
+                    },
+                    display_header_footer=False,
+                    prefer_css_page_size=True,
+                ),
+                timeout=settings.pdf_render_timeout,
             )
-
-            await browser.close()
-            return pdf_bytes
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi.responses import ORJSONResponse
+
+
+def serialize_post(doc: Dict[str, Any]) -> dict:
+    """Converts a raw `posts` document into the API's JSON shape."""
+    data = dict(doc)
+    data["id"] = str(data.pop("_id"))
+    # Internal batch id of the plan swap; not part of the API
+    data.pop("plan_id", None)
+    # Ensure theme is converted to string and removed from data
+    if "theme" in data:
+        data["theme_id"] = str(data.pop("theme"))
+    if isinstance(data.get("created_at"), datetime):
+        data["created_at"] = data["created_at"].isoformat()
+    return data
+
+
+# Optional ThemeResponse fields that stored documents may omit; listed so
+# every theme endpoint returns the same keys whether or not it goes through
+# response_model validation.
+THEME_DEFAULTS = {"description": None, "category": None, "version": 0}
+
+
+def serialize_theme(doc: Dict[str, Any]) -> dict:
+    """Converts a raw `themes` document into the API's JSON shape."""
+    data = {**THEME_DEFAULTS, **doc}
+    data["id"] = str(data.pop("_id"))
+    return data
+
+
+def json_response(
+    content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """Returns already-serialized content straight through orjson.
+
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder walk, which dominate the cost of large listings.
+    """
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+import orjson
+from sse_starlette.sse import EventSourceResponse
+
+from ..agents.progress import ProgressCallback
+
+
+def _encode(data: Any) -> str:
+    return orjson.dumps(data, default=str).decode("utf-8")
+
+
+def progress_stream(
+    run: Callable[[ProgressCallback], Awaitable[Any]],
+) -> EventSourceResponse:
+    """Runs `run(progress)` and streams its progress events as Server-Sent Events.
+
+    Every (event, data) reported through `progress` is forwarded as it happens,
+    followed by a final `result` (or `error`) event. If the client disconnects
+    the run is cancelled, so abandoned work stops instead of running to the end.
+    """
+
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def progress(event: str, data: dict):
+            queue.put_nowait((event, data))
+
+        task = asyncio.create_task(run(progress))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                event, data = item
+                yield {"event": event, "data": _encode(data)}
+
+            if task.cancelled():
+                yield {"event": "error", "data": _encode({"detail": "Cancelled"})}
+            elif task.exception() is not None:
+                detail = str(task.exception())
+                yield {"event": "error", "data": _encode({"detail": detail})}
+            else:
+                yield {"event": "result", "data": _encode(task.result())}
+        finally:
+            if not task.done():
+                print("   ! Stream client disconnected; cancelling run.")
+                task.cancel()
+
+    return EventSourceResponse(events())
@@ -0,0 +1,22 @@
+from typing import Any, Dict, Optional
+
+
+def version_filter(expected_version: int) -> Dict[str, Any]:
+    """Matches documents still at `expected_version`.
+
+    Documents written before versioning existed have no field and count as 0.
+    """
+    if expected_version == 0:
+        return {"$or": [{"version": 0}, {"version": {"$exists": False}}]}
+    return {"version": expected_version}
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Reads the expected version from an `If-Match: "<version>"` header."""
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    try:
+        return int(tag)
+    except ValueError:
+        raise ValueError(f"Invalid If-Match header: {if_match}")
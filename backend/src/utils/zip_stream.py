@@ -0,0 +1,55 @@
+import io
+import zipfile
+from typing import Tuple
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Unseekable sink that collects written bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """Builds a ZIP archive incrementally so it can be streamed while rendering.
+
+    Because the sink is unseekable, zipfile writes data descriptors after each
+    member and every `add()` can be flushed to the client right away.
+    """
+
+    def __init__(self):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode="w")
+        self._names = set()
+
+    def add(self, name: str, data: bytes, compress: bool = False) -> Tuple[str, bytes]:
+        """Adds a member and returns its (possibly de-duplicated) name and the
+        archive bytes produced so far."""
+        base, dot, ext = name.rpartition(".")
+        unique, n = name, 1
+        while unique in self._names:
+            n += 1
+            unique = f"{base}_{n}{dot}{ext}" if dot else f"{name}_{n}"
+        self._names.add(unique)
+
+        # PDFs are already compressed; deflating them again only burns CPU.
+        compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        self._zip.writestr(unique, data, compress_type=compression)
+        return unique, self._buffer.drain()
+
+    def close(self) -> bytes:
+        """Writes the central directory and returns the final bytes."""
+        self._zip.close()
+        return self._buffer.drain()
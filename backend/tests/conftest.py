@@ -0,0 +1,19 @@
+import mongomock
+import pytest
+from mongoengine import connect, disconnect
+from mongomock_motor import AsyncMongoMockClient
+
+import src.database as database
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """In-memory MongoDB for both mongoengine and the async repositories."""
+    connect(
+        "postgenerator_test",
+        host="mongodb://localhost",
+        mongo_client_class=mongomock.MongoClient,
+    )
+    monkeypatch.setattr(database, "_async_client", AsyncMongoMockClient())
+    yield
+    disconnect()
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pypdf import PdfReader, PdfWriter
+
+from src.models.post import Post
+from src.models.theme import Theme
+from src.repositories import posts as posts_repo
+from src.repositories import themes as themes_repo
+from src.routes import posts
+
+
+def _one_page_pdf() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=1080, height=1080)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def client(mock_db, monkeypatch):
+    async def fake_generate_pdf(post_data, author="Aditya Kulkarni"):
+        if post_data["title"] == "Broken":
+            raise asyncio.TimeoutError()
+        return _one_page_pdf()
+
+    monkeypatch.setattr(posts.pdf_generator, "generate_pdf", fake_generate_pdf)
+    app = FastAPI()
+    app.include_router(posts.router)
+    return TestClient(app)
+
+
+def _seed(titles: list) -> tuple:
+    async def seed():
+        theme = await themes_repo.insert_theme(Theme(title="T", month=3, year=2026))
+        ids = [ObjectId() for _ in titles]
+        await posts_repo.insert_posts(
+            [
+                Post(id=pid, title=title, type="article", theme=theme["_id"], day=1)
+                for pid, title in zip(ids, titles)
+            ]
+        )
+        return str(theme["_id"]), [str(pid) for pid in ids]
+
+    return asyncio.run(seed())
+
+
+def test_pdf_export_leaves_out_failed_posts(client):
+    theme_id, ids = _seed(["One", "Broken", "Two"])
+
+    response = client.post(
+        "/posts/export", json={"theme_id": theme_id, "format": "pdf"}
+    )
+
+    assert response.status_code == 200
+    assert len(PdfReader(io.BytesIO(response.content)).pages) == 2
+    assert response.headers["X-Export-Failed"] == ids[1]
+
+
+def test_zip_manifest_names_match_archive_members(client):
+    theme_id, _ = _seed(["Same", "Same", "Broken"])
+
+    response = client.post(
+        "/posts/export", json={"theme_id": theme_id, "format": "zip"}
+    )
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    manifest = json.loads(archive.read("manifest.json"))
+    files = sorted(p["file"] for p in manifest["posts"] if p["status"] == "ok")
+    assert files == ["01_Same_Carousel.pdf", "01_Same_Carousel_2.pdf"]
+    assert sorted(archive.namelist()) == files + ["manifest.json"]
+    assert manifest["failed"] == 1
+    assert [p["error"] for p in manifest["posts"] if p["status"] == "failed"] == [
+        "TimeoutError"
+    ]
@@ -0,0 +1,57 @@
+import asyncio
+
+from src.jobs.queue import JobQueue
+from src.repositories import jobs as jobs_repo
+
+
+def _queue() -> JobQueue:
+    queue = JobQueue(concurrency=2, max_attempts=2, retry_backoff=0.01)
+    attempts = []
+
+    async def flaky(params):
+        attempts.append(params["n"])
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return {"n": params["n"]}
+
+    async def forever(params):
+        await asyncio.sleep(60)
+
+    queue.register("flaky", flaky)
+    queue.register("forever", forever)
+    return queue
+
+
+async def _wait_for(job_id: str, statuses: set) -> dict:
+    for _ in range(200):
+        job = await jobs_repo.get_job(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stayed {job['status']}")
+
+
+def test_jobs_retry_succeed_and_cancel(mock_db):
+    async def run():
+        queue = _queue()
+        await queue.start()
+        try:
+            job = await queue.submit("flaky", {"n": 1})
+            # An active job with the same parameters is returned, not duplicated
+            again = await queue.submit("flaky", {"n": 1})
+            assert again["_id"] == job["_id"]
+
+            done = await _wait_for(str(job["_id"]), {"succeeded", "failed"})
+            assert (done["status"], done["attempts"]) == ("succeeded", 2)
+            assert done["result"] == {"n": 1}
+
+            slow = await queue.submit("forever", {})
+            await _wait_for(str(slow["_id"]), {"running"})
+            cancelled = await queue.cancel(str(slow["_id"]))
+            assert cancelled["status"] == "cancelled"
+            # Cancelling a finished job leaves it untouched
+            assert (await queue.cancel(str(job["_id"])))["status"] == "succeeded"
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
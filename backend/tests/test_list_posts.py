@@ -0,0 +1,121 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockCollection
+
+from src.models.post import Post
+from src.models.theme import Theme
+from src.repositories import posts as posts_repo
+from src.repositories import themes as themes_repo
+from src.routes import posts
+
+
+@pytest.fixture
+def client(mock_db):
+    app = FastAPI()
+    app.include_router(posts.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def query_counter(monkeypatch):
+    """Counts find/find_one calls per collection made through the async driver."""
+    calls = Counter()
+
+    for method in ("find", "find_one"):
+        original = getattr(AsyncMongoMockCollection, method)
+
+        def counted(self, *args, _method=method, _original=original, **kwargs):
+            calls[(self.name, _method)] += 1
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(AsyncMongoMockCollection, method, counted)
+    return calls
+
+
+def _seed(num_themes: int, posts_per_theme: int) -> list:
+    async def seed():
+        themes = []
+        for i in range(num_themes):
+            themes.append(
+                await themes_repo.insert_theme(
+                    Theme(title=f"T{i}", month=i + 1, year=2026)
+                )
+            )
+        await posts_repo.insert_posts(
+            [
+                Post(
+                    id=ObjectId(),
+                    title=f"Post {n}",
+                    type="article",
+                    theme=theme["_id"],
+                    day=n % 28 + 1,
+                )
+                for theme in themes
+                for n in range(posts_per_theme)
+            ]
+        )
+        return themes
+
+    return asyncio.run(seed())
+
+
+def test_listing_1000_posts_resolves_themes_in_one_query(client, query_counter):
+    _seed(num_themes=10, posts_per_theme=100)
+    query_counter.clear()
+
+    response = client.get("/posts/")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 1000
+    assert all(post["date"] for post in body)
+    # One query for the posts and one bulk query for all of their themes
+    assert query_counter == Counter({("posts", "find"): 1, ("themes", "find"): 1})
+
+
+def test_listing_a_month_uses_the_already_loaded_theme(client, query_counter):
+    _seed(num_themes=2, posts_per_theme=500)
+    query_counter.clear()
+
+    response = client.get("/posts/", params={"month": 1, "year": 2026})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 500
+    assert query_counter == Counter({("themes", "find_one"): 1, ("posts", "find"): 1})
+
+
+def test_keyset_pages_walk_past_undated_posts(client):
+    theme = _seed(num_themes=1, posts_per_theme=3)[0]
+    asyncio.run(
+        posts_repo.insert_posts(
+            [
+                Post(
+                    id=ObjectId(),
+                    title=f"Undated {n}",
+                    type="article",
+                    theme=theme["_id"],
+                )
+                for n in range(3)
+            ]
+        )
+    )
+
+    seen, cursor = [], None
+    while True:
+        params = {"month": 1, "year": 2026, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/posts/", params=params)
+        assert response.status_code == 200
+        seen += [(p.get("day"), p["title"]) for p in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Undated posts sort first, then every dated post still follows
+    assert [day for day, _ in seen] == [None, None, None, 1, 2, 3]
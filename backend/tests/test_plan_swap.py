@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.models.theme import Theme
+from src.repositories import posts as posts_repo
+from src.repositories import themes as themes_repo
+from src.routes import posts, themes
+
+
+def _topics(label: str, days: int = 3) -> list:
+    return [
+        {
+            "day": day,
+            "title": f"{label} {day}",
+            "type": "article",
+            "learning_objective": "objective",
+            "difficulty": "Beginner",
+            "search_queries": ["query"],
+        }
+        for day in range(1, days + 1)
+    ]
+
+
+@pytest.fixture
+def theme(mock_db):
+    return asyncio.run(
+        themes_repo.insert_theme(Theme(title="Theme", month=1, year=2026))
+    )
+
+
+def test_overlapping_plans_never_empty_the_theme(theme, monkeypatch):
+    labels = iter(["A", "B"])
+
+    async def plan_curriculum(*args, **kwargs):
+        return _topics(next(labels))
+
+    delete_posts = posts_repo.delete_posts
+
+    async def slow_delete_posts(query):
+        # Let both plans insert before either retires the other
+        await asyncio.sleep(0.05)
+        return await delete_posts(query)
+
+    monkeypatch.setattr(themes, "plan_curriculum", plan_curriculum)
+    monkeypatch.setattr(posts_repo, "delete_posts", slow_delete_posts)
+
+    async def run():
+        await asyncio.gather(themes._plan_and_save(theme), themes._plan_and_save(theme))
+        return await posts_repo.find_posts({"theme": theme["_id"]})
+
+    remaining = asyncio.run(run())
+
+    # Exactly one complete plan survives: the newer one
+    assert sorted(p["title"] for p in remaining) == ["B 1", "B 2", "B 3"]
+
+
+def test_planned_posts_are_served_by_the_api(theme, monkeypatch):
+    async def plan_curriculum(*args, **kwargs):
+        return _topics("A")
+
+    monkeypatch.setattr(themes, "plan_curriculum", plan_curriculum)
+    app = FastAPI()
+    app.include_router(themes.router)
+    app.include_router(posts.router)
+    client = TestClient(app)
+
+    planned = client.post(f"/themes/{theme['_id']}/plan")
+    assert planned.status_code == 201
+    assert all("plan_id" not in post for post in planned.json())
+
+    for params in ({}, {"month": 1, "year": 2026}):
+        listed = client.get("/posts/", params=params)
+        assert listed.status_code == 200
+        assert sorted(p["title"] for p in listed.json()) == ["A 1", "A 2", "A 3"]
+
+    post_id = planned.json()[0]["id"]
+    assert client.get(f"/posts/{post_id}").status_code == 200
@@ -0,0 +1,69 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from mongoengine import connect, disconnect
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.database import explain_hot_queries
+from src.models.post import Post
+from src.models.theme import Theme
+
+# explain() needs a real server; mongomock does not implement query planning.
+TEST_MONGODB_URI = os.getenv(
+    "TEST_MONGODB_URI", "mongodb://localhost:27017/postgenerator_test"
+)
+
+
+def _server_available() -> bool:
+    try:
+        MongoClient(TEST_MONGODB_URI, serverSelectionTimeoutMS=500).admin.command(
+            "ping"
+        )
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not _server_available(), reason=f"No MongoDB server at {TEST_MONGODB_URI}"
+)
+
+
+@pytest.fixture
+def seeded_db():
+    db = connect(host=TEST_MONGODB_URI)
+    db.drop_database(db.get_default_database().name)
+    Post.ensure_indexes()
+    Theme.ensure_indexes()
+
+    theme = Theme(title="Theme", month=1, year=2026)
+    theme.save()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    Post.objects.insert(
+        [
+            Post(
+                id=ObjectId(),
+                title=f"Post {i}",
+                type="article",
+                theme=theme.id,
+                day=i % 31 + 1,
+                status="planned" if i % 2 else "researched",
+                created_at=start + timedelta(minutes=i),
+            )
+            for i in range(200)
+        ]
+    )
+    yield
+    db.drop_database(db.get_default_database().name)
+    disconnect()
+
+
+def test_hot_queries_use_an_index(seeded_db):
+    for name, stages in explain_hot_queries().items():
+        assert "IXSCAN" in stages, f"{name}: {sorted(stages)}"
+        assert "COLLSCAN" not in stages, f"{name}: {sorted(stages)}"
+        # A blocking SORT means the index serves the filter but not the order.
+        assert "SORT" not in stages, f"{name}: {sorted(stages)}"
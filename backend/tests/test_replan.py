@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.models.post import Post
+from src.models.theme import Theme
+from src.repositories import jobs as jobs_repo
+from src.repositories import posts as posts_repo
+from src.repositories import themes as themes_repo
+from src.routes import themes
+
+
+@pytest.fixture
+def theme(mock_db):
+    async def seed():
+        theme = await themes_repo.insert_theme(Theme(title="Theme", month=2, year=2026))
+        await posts_repo.insert_posts(
+            [
+                Post(
+                    id=ObjectId(),
+                    title=f"Old {day}",
+                    type="article",
+                    day=day,
+                    theme=theme["_id"],
+                    status="researched" if day == 3 else "planned",
+                )
+                for day in range(1, 6)
+            ]
+        )
+        return theme
+
+    return asyncio.run(seed())
+
+
+@pytest.fixture
+def client(theme):
+    app = FastAPI()
+    app.include_router(themes.router)
+    return TestClient(app)
+
+
+def _topic(day: int) -> dict:
+    return {
+        "day": day,
+        "title": f"New {day}",
+        "type": "article",
+        "learning_objective": "objective",
+        "difficulty": "Beginner",
+        "search_queries": ["query"],
+    }
+
+
+@pytest.mark.parametrize("body", [{"days": [29]}, {"days": [3]}])
+def test_async_replan_rejects_impossible_requests_up_front(client, theme, body):
+    response = client.post(
+        f"/themes/{theme['_id']}/replan", params={"async": True}, json=body
+    )
+
+    assert response.status_code == 400
+    assert asyncio.run(jobs_repo.find_job({})) is None
+
+
+def test_replan_reports_only_writes_that_landed(client, theme, monkeypatch):
+    async def replan_days(title, month, year, days, **kwargs):
+        # Day 2 gets researched while the LLM is still running
+        await posts_repo.update_post(
+            str(posts_by_day[2]["_id"]), {"status": "researched"}
+        )
+        return [_topic(day) for day in days]
+
+    posts_by_day = {
+        p["day"]: p for p in asyncio.run(posts_repo.find_posts({"theme": theme["_id"]}))
+    }
+    monkeypatch.setattr(themes, "replan_days", replan_days)
+
+    response = client.post(
+        f"/themes/{theme['_id']}/replan", json={"start_day": 1, "end_day": 7}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["day"] for p in body["posts"]] == [1, 4, 5, 6, 7]
+    assert body["skipped_days"] == [2, 3]
+    day_two = asyncio.run(posts_repo.get_post(str(posts_by_day[2]["_id"])))
+    assert day_two["title"] == "Old 2"
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.models.theme import Theme
+from src.repositories import themes as themes_repo
+from src.routes import themes
+
+
+@pytest.fixture
+def client(mock_db):
+    asyncio.run(themes_repo.insert_theme(Theme(title="Theme", month=3, year=2026)))
+    app = FastAPI()
+    app.include_router(themes.router)
+    return TestClient(app)
+
+
+def test_listing_returns_the_same_shape_as_single_theme_endpoints(client):
+    listed = client.get("/themes/").json()
+    single = client.get("/themes/2026/3").json()
+
+    assert listed == [single]
+    assert listed[0]["description"] is None
+    assert listed[0]["category"] is None